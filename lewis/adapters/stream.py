@@ -19,9 +19,14 @@
 
 import asynchat
 import asyncore
+import collections
+import heapq
 import inspect
+import operator
 import re
 import socket
+import time
+import weakref
 
 from scanf import scanf_compile
 
@@ -37,9 +42,14 @@ class StreamHandler(asynchat.async_chat):
         asynchat.async_chat.__init__(self, sock=sock)
         self.set_terminator(target.in_terminator.encode())
         self._readtimeout = target.readtimeout
-        self._readtimer = 0
+        self._readtimeout_delay = self._readtimeout / 1000.0
+        self._readtimeout_epoch = 0
         self._target = target
         self._buffer = []
+        self._max_batch_size = target.max_batch_size
+        self._out_terminator = None
+        self._encoded_out_terminator = None
+        self._pending_unsolicited = collections.deque()
 
         self._stream_server = stream_server
         self._target.handler = self
@@ -47,30 +57,37 @@ class StreamHandler(asynchat.async_chat):
         self._set_logging_context(target)
         self.log.info("Client connected from %s:%s", *sock.getpeername())
 
-    def process(self, msec):
-        if not self._buffer:
-            return
+    @property
+    def readtimeout_delay(self):
+        """Read timeout of the target in seconds, 0 if disabled."""
+        return self._readtimeout_delay
 
-        if self._readtimer >= self._readtimeout and self._readtimeout != 0:
-            if not self.get_terminator():
-                # If no terminator is set, this timeout is the terminator
-                self.found_terminator()
-            else:
-                self._readtimer = 0
-                request = self._get_request()
-                with self._stream_server.device_lock:
-                    error = RuntimeError(
-                        "ReadTimeout while waiting for command terminator."
-                    )
-                    reply = self._handle_error(request, error)
-                self._send_reply(reply)
+    def handle_readtimeout(self, epoch):
+        """
+        Called by :class:`StreamServer` once the read timeout scheduled for ``epoch`` has
+        expired. Timeouts scheduled before more data arrived are stale and ignored.
 
-        if self._buffer:
-            self._readtimer += msec
+        :param epoch: Value of the data epoch counter at the time the timeout was scheduled.
+        """
+        if epoch != self._readtimeout_epoch or not self._buffer or not self.connected:
+            return
+
+        if not self.get_terminator():
+            # If no terminator is set, this timeout is the terminator
+            self.found_terminator()
+        else:
+            request = self._get_request()
+            with self._stream_server.device_lock:
+                error = RuntimeError("ReadTimeout while waiting for command terminator.")
+                reply = self._handle_error(request, error)
+            self._send_reply(reply)
 
     def collect_incoming_data(self, data):
         self._buffer.append(data)
-        self._readtimer = 0
+        self._readtimeout_epoch += 1
+
+        if self._readtimeout != 0:
+            self._stream_server.schedule_readtimeout(self, self._readtimeout_epoch)
 
     def _get_request(self):
         request = b"".join(self._buffer)
@@ -78,16 +95,35 @@ class StreamHandler(asynchat.async_chat):
         self.log.debug("Got request %s", request)
         return request
 
+    def _encode_reply(self, reply):
+        if isinstance(reply, str):
+            reply = reply.encode()
+
+        # The encoded terminator is cached, but the interface may still replace it at any time
+        out_terminator = self._target.out_terminator
+        if out_terminator is not self._out_terminator:
+            self._out_terminator = out_terminator
+            self._encoded_out_terminator = (
+                out_terminator.encode() if isinstance(out_terminator, str) else out_terminator
+            )
+
+        return reply + self._encoded_out_terminator
+
+    def _push_data(self, data):
+        # asynchat splits data larger than its output buffer into chunks and slices again
+        # after partial sends, on a memoryview these slices do not copy the payload.
+        if len(data) > self.ac_out_buffer_size:
+            data = memoryview(data)
+
+        self.push(data)
+
     def _push(self, reply):
+        # Unsolicited replies queued before this reply must also reach the client before it
+        if self._pending_unsolicited:
+            self.flush_unsolicited()
+
         try:
-            if isinstance(reply, str):
-                reply = reply.encode()
-            out_terminator = (
-                self._target.out_terminator.encode()
-                if isinstance(self._target.out_terminator, str)
-                else self._target.out_terminator
-            )
-            self.push(reply + out_terminator)
+            self._push_data(self._encode_reply(reply))
         except TypeError as e:
             self.log.error("Problem creating reply, type error {}!".format(e))
 
@@ -101,39 +137,56 @@ class StreamHandler(asynchat.async_chat):
         return self._target.handle_error(request, error)
 
     def found_terminator(self):
-        self._readtimer = 0
-
         request = self._get_request()
 
-        with self._stream_server.device_lock:
-            try:
-                cmd = next(
-                    (
-                        cmd
-                        for cmd in self._target.bound_commands
-                        if cmd.can_process(request)
-                    ),
-                    None,
-                )
+        try:
+            # Matching is read-only, so only processing the request needs the device lock
+            cmd, pattern, arguments = self._target.dispatch(request)
 
-                if cmd is None:
-                    raise RuntimeError("None of the device's commands matched.")
+            if cmd is None:
+                raise RuntimeError("None of the device's commands matched.")
 
-                self.log.info(
-                    "Processing request %s using command %s",
-                    request,
-                    cmd.matcher.pattern,
-                )
+            self.log.info("Processing request %s using command %s", request, pattern)
 
-                reply = cmd.process_request(request)
-            except Exception as error:
+            with self._stream_server.device_lock:
+                reply = cmd.process_match(arguments)
+        except Exception as error:
+            with self._stream_server.device_lock:
                 reply = self._handle_error(request, error)
 
         self._send_reply(reply)
 
     def unsolicited_reply(self, reply):
-        self.log.debug("Sending unsolicited reply %s", reply)
-        self._push(reply)
+        """
+        Queues a reply that is not a response to a request. Queued replies are sent together
+        in one push when :class:`StreamServer` processes pending work, as soon as the
+        interface's ``max_batch_size`` is reached, or right before the next regular reply.
+
+        :param reply: Reply to send, str or bytes without terminator.
+        """
+        self.log.debug("Queueing unsolicited reply %s", reply)
+        self._pending_unsolicited.append(reply)
+
+        if len(self._pending_unsolicited) >= self._max_batch_size:
+            self.flush_unsolicited()
+        else:
+            self._stream_server.schedule_flush(self)
+
+    def flush_unsolicited(self):
+        """Sends all queued unsolicited replies in a single push."""
+        data = []
+        pending = self._pending_unsolicited
+
+        while pending:
+            reply = pending.popleft()
+            try:
+                data.append(self._encode_reply(reply))
+            except TypeError as e:
+                self.log.error("Problem creating reply, type error {}!".format(e))
+
+        if data and self.connected:
+            self.log.debug("Sending %d unsolicited replies", len(data))
+            self._push_data(b"".join(data))
 
     def handle_close(self):
         self.log.info("Closing connection to client %s:%s", *self.socket.getpeername())
@@ -156,6 +209,8 @@ class StreamServer(asyncore.dispatcher):
         self.log.info("Listening on %s:%s", host, port)
 
         self._accepted_connections = []
+        self._readtimeout_heap = []
+        self._pending_flush = set()
 
     def handle_accept(self):
         pair = self.accept()
@@ -167,6 +222,7 @@ class StreamServer(asyncore.dispatcher):
 
     def remove_handler(self, handler):
         self._accepted_connections.remove(handler)
+        self._pending_flush.discard(handler)
 
     def close(self):
         # As this is an old style class, the base class method must
@@ -180,10 +236,52 @@ class StreamServer(asyncore.dispatcher):
             handler.close()
 
         self._accepted_connections = []
+        self._readtimeout_heap = []
+        self._pending_flush = set()
 
-    def process(self, msec):
-        for handler in self._accepted_connections:
-            handler.process(msec)
+    def schedule_flush(self, handler):
+        """
+        Marks the handler as having queued unsolicited replies, they are sent on the
+        next call to :meth:`process`.
+
+        :param handler: The :class:`StreamHandler` with queued replies.
+        """
+        self._pending_flush.add(handler)
+
+    def schedule_readtimeout(self, handler, epoch):
+        """
+        Schedules a read timeout for the supplied handler, it expires
+        ``handler.readtimeout_delay`` seconds from now, unless more data arrives in the meantime.
+
+        :param handler: The :class:`StreamHandler` that received data.
+        :param epoch: Data epoch of the handler, used to detect stale timeouts.
+        """
+        deadline = time.monotonic() + handler.readtimeout_delay
+        heapq.heappush(
+            self._readtimeout_heap, (deadline, id(handler), epoch, weakref.ref(handler))
+        )
+
+    def process(self, msec=None):
+        """
+        Sends queued unsolicited replies and notifies all handlers with an expired read timeout.
+        Handlers without pending work are not touched, so the cost does not grow with the
+        number of idle connections.
+
+        :param msec: Not used anymore, read timeouts are tracked against a monotonic clock.
+                     The parameter is kept for backwards compatibility.
+        """
+        while self._pending_flush:
+            self._pending_flush.pop().flush_unsolicited()
+
+        heap = self._readtimeout_heap
+        now = time.monotonic()
+
+        while heap and heap[0][0] <= now:
+            _, _, epoch, handler_ref = heapq.heappop(heap)
+            handler = handler_ref()
+
+            if handler is not None:
+                handler.handle_readtimeout(epoch)
 
 
 class PatternMatcher:
@@ -228,6 +326,11 @@ class PatternMatcher:
         raise NotImplementedError("The match-method must be implemented.")
 
 
+# Compiled expressions by encoded pattern, shared by all regex-objects. Command definitions are
+# static, so re-binding interfaces (or exposing the same pattern twice) never compiles again.
+_compiled_patterns = {}
+
+
 class regex(PatternMatcher):
     """
     Implementation of :class:`PatternMatcher` that compiles the specified pattern into a regular
@@ -237,7 +340,16 @@ class regex(PatternMatcher):
     def __init__(self, pattern):
         super(regex, self).__init__(pattern)
 
-        self.compiled_pattern = re.compile(pattern.encode())
+        encoded_pattern = pattern.encode()
+        compiled_pattern = _compiled_patterns.get(encoded_pattern)
+
+        if compiled_pattern is None:
+            compiled_pattern = re.compile(encoded_pattern)
+            _compiled_patterns[encoded_pattern] = compiled_pattern
+
+        self.compiled_pattern = compiled_pattern
+        self._exact_match = False
+        self._match = self.compiled_pattern.match
 
     @property
     def arg_count(self):
@@ -248,7 +360,7 @@ class regex(PatternMatcher):
         return None
 
     def match(self, request):
-        match = self.compiled_pattern.match(request)
+        match = self._match(request)
 
         if match is None:
             return None
@@ -283,12 +395,12 @@ class scanf(regex):
         self._scanf_pattern = pattern
 
         generated_regex, self._argument_mappings = scanf_compile(pattern)
-        regex_pattern = generated_regex.pattern
 
-        if exact_match:
-            regex_pattern = "^{}$".format(regex_pattern)
+        super(scanf, self).__init__(generated_regex.pattern)
 
-        super(scanf, self).__init__(regex_pattern)
+        if exact_match:
+            self._exact_match = True
+            self._match = self.compiled_pattern.fullmatch
 
     @property
     def pattern(self):
@@ -346,6 +458,8 @@ class Func:
     .. _re: https://docs.python.org/2/library/re.html#regular-expression-syntax
     """
 
+    __slots__ = ("func", "matcher", "_match", "argument_mappings", "return_mapping", "doc")
+
     def __init__(
         self, func, pattern, argument_mappings=None, return_mapping=None, doc=None
     ):
@@ -367,6 +481,7 @@ class Func:
                 )
 
         self.matcher = pattern
+        self._match = pattern.match
 
         if argument_mappings is None:
             argument_mappings = self.matcher.argument_mappings or None
@@ -399,15 +514,26 @@ class Func:
         self.doc = doc or (inspect.getdoc(self.func) if callable(self.func) else None)
 
     def can_process(self, request):
-        return self.matcher.match(request) is not None
+        return self._match(request) is not None
 
     def process_request(self, request):
-        match = self.matcher.match(request)
+        match = self._match(request)
 
         if match is None:
             raise RuntimeError("Request can not be processed.")
 
-        args = self.map_arguments(match)
+        return self.process_match(match)
+
+    def process_match(self, arguments):
+        """
+        Calls the function with the arguments that the matcher has extracted from a request
+        and returns the mapped return value. This is useful if the request has already been
+        matched, for example by :class:`CommandDispatcher`.
+
+        :param arguments: Matched arguments as returned by :meth:`PatternMatcher.match`.
+        :return: Mapped return value of the function.
+        """
+        args = self.map_arguments(arguments)
 
         return self.map_return_value(self.func(*args))
 
@@ -545,21 +671,25 @@ class Cmd(CommandBase):
     ):
         super(Cmd, self).__init__(func, pattern, argument_mappings, return_mapping, doc)
 
+        # The matcher does not depend on the bound target, it is cached after the first bind
+        self._matcher = None
+
     def bind(self, target):
         method = self.func if callable(self.func) else getattr(target, self.func, None)
 
         if method is None:
             return None
 
-        return [
-            Func(
-                method,
-                self.pattern,
-                self.argument_mappings,
-                self.return_mapping,
-                self.doc,
-            )
-        ]
+        func = Func(
+            method,
+            self._matcher or self.pattern,
+            self.argument_mappings,
+            self.return_mapping,
+            self.doc,
+        )
+        self._matcher = func.matcher
+
+        return [func]
 
 
 class Var(CommandBase):
@@ -627,54 +757,162 @@ class Var(CommandBase):
         self.read_pattern = read_pattern
         self.write_pattern = write_pattern
 
+        # Matchers and docs do not depend on the bound instance, they are cached
+        # so that re-binding to a new device does not repeat that work.
+        self._read_matcher = None
+        self._write_matcher = None
+        self._property_docs = {}
+
+    def _get_property_docs(self, target_type):
+        if target_type not in self._property_docs:
+            docs = (None, None)
+
+            # Copy docstring if target is a @property
+            prop = getattr(target_type, self.func, None)
+            prop_doc = inspect.getdoc(prop) if inspect.isdatadescriptor(prop) else None
+            if prop_doc:
+                docs = ("Getter: " + prop_doc, "Setter: " + prop_doc)
+
+            self._property_docs[target_type] = docs
+
+        return self._property_docs[target_type]
+
     def bind(self, target):
         if self.func not in dir(target):
             return None
 
         funcs = []
+        member = self.func
+        getter_doc, setter_doc = self._get_property_docs(type(target))
 
         if self.read_pattern is not None:
-
             def getter():
-                return getattr(target, self.func)
+                return getattr(target, member)
 
-            # Copy docstring if target is a @property
-            prop = getattr(type(target), self.func, None)
-            if prop and inspect.isdatadescriptor(prop):
-                getter.__doc__ = "Getter: " + inspect.getdoc(prop)
-
-            funcs.append(
-                Func(
-                    getter,
-                    self.read_pattern,
-                    return_mapping=self.return_mapping,
-                    doc=self.doc,
-                )
+            getter.__doc__ = getter_doc
+
+            read_func = Func(
+                getter,
+                self._read_matcher or self.read_pattern,
+                return_mapping=self.return_mapping,
+                doc=self.doc,
             )
+            self._read_matcher = read_func.matcher
+
+            funcs.append(read_func)
 
         if self.write_pattern is not None:
 
             def setter(new_value):
-                setattr(target, self.func, new_value)
+                setattr(target, member, new_value)
 
-            # Copy docstring if target is a @property
-            prop = getattr(type(target), self.func, None)
-            if prop and inspect.isdatadescriptor(prop):
-                setter.__doc__ = "Setter: " + inspect.getdoc(prop)
-
-            funcs.append(
-                Func(
-                    setter,
-                    self.write_pattern,
-                    argument_mappings=self.argument_mappings,
-                    return_mapping=self.return_mapping,
-                    doc=self.doc,
-                )
+            setter.__doc__ = setter_doc
+
+            write_func = Func(
+                setter,
+                self._write_matcher or self.write_pattern,
+                argument_mappings=self.argument_mappings,
+                return_mapping=self.return_mapping,
+                doc=self.doc,
             )
+            self._write_matcher = write_func.matcher
+
+            funcs.append(write_func)
 
         return funcs
 
 
+# Numbered backreferences and conditionals, these can not be moved into a combined expression
+_group_reference = re.compile(rb"(?<!\\)(?:\\\\)*\\(?:[1-9]|g<)|\(\?P=|\(\?\(")
+
+
+class CommandDispatcher:
+    """
+    Finds the bound command that can process a request. One dispatcher is created per
+    :class:`StreamInterface` when the device is bound and it is shared by all client
+    connections, so that per-request matching state is not duplicated for each handler.
+
+    If possible, the patterns of all commands are combined into a single alternation, so that
+    a request is matched in one pass of the regular expression engine instead of trying each
+    command in turn. Alternatives are tried in order, so the first matching command still wins.
+    Commands with custom matchers, inline flags or group references can not be combined, if any
+    of those are present, commands are matched one after the other.
+
+    :param commands: Iterable of bound :class:`Func`-objects, in matching order.
+    """
+
+    def __init__(self, commands):
+        self._commands = tuple(
+            (cmd, cmd.matcher.pattern, cmd.matcher.match) for cmd in commands
+        )
+        self._combined_match, self._alternatives = self._combine(commands)
+
+    @staticmethod
+    def _combine(commands):
+        parts = []
+        alternatives = {}
+        group = 1
+
+        for cmd in commands:
+            matcher = cmd.matcher
+
+            if not isinstance(matcher, regex) or type(matcher).match is not regex.match:
+                return None, None
+
+            compiled = matcher.compiled_pattern
+            if compiled.flags or _group_reference.search(compiled.pattern):
+                return None, None
+
+            parts.append(
+                b"(" + compiled.pattern + (b")\\Z" if matcher._exact_match else b")")
+            )
+            alternatives[group] = (cmd, matcher.pattern, group, group + compiled.groups)
+            group += compiled.groups + 1
+
+        if not parts:
+            return None, None
+
+        try:
+            combined = re.compile(b"|".join(parts))
+        except re.error:
+            return None, None
+
+        return combined.match, alternatives
+
+    @property
+    def is_combined(self):
+        """True if requests are matched against a single combined expression."""
+        return self._combined_match is not None
+
+    def match(self, request):
+        """
+        Returns the first command that can process the request along with its pattern and
+        the arguments extracted from the request. These can be passed to
+        :meth:`Func.process_match` so that the request does not have to be matched again.
+
+        :param request: Request to match.
+        :return: Tuple of (command, pattern, arguments) or (None, None, None) if no
+                 command matches.
+        """
+        if self._combined_match is not None:
+            match = self._combined_match(request)
+
+            if match is None:
+                return None, None, None
+
+            # The wrapping group of the matched alternative is always the last one to close
+            cmd, pattern, first, last = self._alternatives[match.lastindex]
+            return cmd, pattern, match.groups()[first:last]
+
+        for cmd, pattern, match in self._commands:
+            arguments = match(request)
+
+            if arguments is not None:
+                return cmd, pattern, arguments
+
+        return None, None, None
+
+
 class StreamAdapter(Adapter):
     """
     The StreamAdapter is the bridge between the Device Interface and the TCP Stream networking
@@ -695,17 +933,23 @@ class StreamAdapter(Adapter):
         super(StreamAdapter, self).__init__(options)
         self._server = None
 
+        # Formatted command docs, only rebuilt when the interface binds a new list of commands
+        self._command_docs = []
+        self._command_docs_source = ()
+
     @property
     def documentation(self):
-        commands = [
-            "{}:\n{}".format(
-                cmd.matcher.pattern,
-                format_doc_text(cmd.doc or inspect.getdoc(cmd.func) or ""),
-            )
-            for cmd in sorted(
-                self.interface.bound_commands, key=lambda x: x.matcher.pattern
-            )
-        ]
+        bound_commands = self.interface.bound_commands
+
+        if bound_commands is not self._command_docs_source:
+            self._command_docs = [
+                "{}:\n{}".format(
+                    cmd.matcher.pattern,
+                    format_doc_text(cmd.doc or inspect.getdoc(cmd.func) or ""),
+                )
+                for cmd in sorted(bound_commands, key=operator.attrgetter("matcher.pattern"))
+            ]
+            self._command_docs_source = bound_commands
 
         options = format_doc_text(
             "Listening on: {}\nPort: {}\nRequest terminator: {}\nReply terminator: {}".format(
@@ -723,7 +967,7 @@ class StreamAdapter(Adapter):
                 options,
                 "Commands\n========",
             ]
-            + commands
+            + self._command_docs
         )
 
     def start_server(self):
@@ -784,6 +1028,9 @@ class StreamInterface(InterfaceBase):
      - readtimeout: How many msec to wait for additional data between packets, once transmission
        of an incoming command has begun. Inverse of ReadTimeout in protocol files.
        Defaults to 100 (ms). Set to 0 to disable timeout completely.
+     - max_batch_size: Maximum number of unsolicited replies that are queued before they are
+       sent. Replies are otherwise sent together once per adapter cycle. Defaults to 100,
+       set to 1 to send each unsolicited reply immediately.
      - commands: A list of :class:`~CommandBase`-objects that define mappings between protocol
        and device/interface methods/attributes.
 
@@ -822,11 +1069,17 @@ class StreamInterface(InterfaceBase):
 
     readtimeout = 100
 
+    max_batch_size = 100
+
     commands = None
 
     def __init__(self):
         super(StreamInterface, self).__init__()
         self.bound_commands = None
+        self._dispatcher = CommandDispatcher(())
+
+        # Per command, whether its member was found on the device instead of the interface
+        self._command_binds_to_device = {}
 
     @property
     def adapter(self):
@@ -837,14 +1090,12 @@ class StreamInterface(InterfaceBase):
         This method implements ``_bind_device`` from :class:`~lewis.core.devices.InterfaceBase`.
         It binds Cmd and Var definitions to implementations in Interface and Device.
         """
-        patterns = set()
-
-        self.bound_commands = []
+        commands_by_pattern = {}
 
         for cmd in self.commands:
-            bound = cmd.bind(self) or cmd.bind(self.device) or None
+            bound = self._bind_command(cmd)
 
-            if bound is None:
+            if not bound:
                 raise RuntimeError(
                     "Unable to produce callable object for non-existing member '{}' "
                     "of device or interface.".format(cmd.func)
@@ -852,15 +1103,43 @@ class StreamInterface(InterfaceBase):
 
             for bound_cmd in bound:
                 pattern = bound_cmd.matcher.pattern
-                if pattern in patterns:
+                if commands_by_pattern.setdefault(pattern, bound_cmd) is not bound_cmd:
                     raise RuntimeError(
                         "The regular expression {} is "
                         "associated with multiple commands.".format(pattern)
                     )
 
-                patterns.add(pattern)
+        self.bound_commands = list(commands_by_pattern.values())
+        self._dispatcher = CommandDispatcher(self.bound_commands)
+
+    def _bind_command(self, cmd):
+        """
+        Binds the command to the interface, or to the device if the interface does not have the
+        member. Where the member was found is remembered, so that re-binding to a new device
+        tries that target first instead of failing on the interface each time.
+        """
+        if self._command_binds_to_device.get(cmd):
+            targets = (self.device, self)
+        else:
+            targets = (self, self.device)
+
+        for target in targets:
+            bound = cmd.bind(target)
+
+            if bound:
+                self._command_binds_to_device[cmd] = target is not self
+                return bound
+
+        return None
+
+    def dispatch(self, request):
+        """
+        Finds the bound command that can process the request.
 
-                self.bound_commands.append(bound_cmd)
+        :param request: Request to match.
+        :return: Tuple of (command, pattern, arguments), see :meth:`CommandDispatcher.match`.
+        """
+        return self._dispatcher.match(request)
 
     def handle_error(self, request, error):
         """
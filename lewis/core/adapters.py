@@ -23,9 +23,11 @@ implementations in :mod:`lewis.adapters`. It also contains :class:`AdapterCollec
 be used to store multiple adapters and manage them together.
 """
 
+import functools
 import inspect
 import logging
 import threading
+import time
 from collections import namedtuple
 from types import TracebackType
 from typing import Any, Optional, Type
@@ -33,7 +35,12 @@ from typing import Any, Optional, Type
 from lewis.core.devices import DeviceBase, InterfaceBase
 from lewis.core.exceptions import LewisException
 from lewis.core.logging import has_log
-from lewis.core.utils import dict_strict_update
+
+
+@functools.lru_cache(maxsize=None)
+def _options_type(fields: tuple[str, ...]) -> type:
+    # Creating a namedtuple type is expensive, adapters with the same options share one
+    return namedtuple("adapter_options", fields)
 
 
 class NoLock:
@@ -97,35 +104,47 @@ class Adapter:
     :param options: Configuration options for the adapter.
     """
 
+    __slots__ = (
+        "_interface",
+        "_interface_protocol",
+        "device_lock",
+        "_options",
+        "_options_dict",
+        "_wakeup",
+    )
+
     default_options = {}
 
     def __init__(self, options: dict[str, Any] | None = None) -> None:
         super(Adapter, self).__init__()
         self._interface = None
+        self._interface_protocol = None
 
         self.device_lock: threading.Lock | NoLock = NoLock()
+        self._wakeup = threading.Event()
 
         options = options or {}
-        combined_options = dict(self.default_options)
+        invalid_options = options.keys() - self.default_options.keys()
 
-        try:
-            dict_strict_update(combined_options, options)
-        except RuntimeError as e:
+        if invalid_options:
             raise LewisException(
                 "Invalid options found: {}. Valid options are: {}".format(
-                    ", ".join(e.args[1]), ", ".join(self.default_options.keys())
+                    ", ".join(sorted(invalid_options)), ", ".join(self.default_options.keys())
                 )
             )
 
-        options_type = namedtuple("adapter_options", list(combined_options.keys()))
-        self._options = options_type(**combined_options)
+        combined_options = {**self.default_options, **options}
+
+        self._options = _options_type(tuple(combined_options))(**combined_options)
+        self._options_dict = combined_options
 
     @property
     def protocol(self) -> str | None:
-        if self.interface is None:
-            return None
-
-        return self.interface.protocol
+        """
+        The protocol of the interface, or None if there is no interface. It is read from the
+        interface when that is assigned, so the protocol should not be changed afterwards.
+        """
+        return self._interface_protocol
 
     @property
     def interface(self) -> InterfaceBase | None:
@@ -141,6 +160,7 @@ class Adapter:
     @interface.setter
     def interface(self, new_interface: InterfaceBase | None) -> None:
         self._interface = new_interface
+        self._interface_protocol = None if new_interface is None else new_interface.protocol
 
     @property
     def documentation(self) -> str:
@@ -148,7 +168,15 @@ class Adapter:
         This property can be overridden in a sub-class to provide protocol documentation to users
         at runtime. By default it returns the indentation cleaned-up docstring of the class.
         """
-        return inspect.getdoc(self) or ""
+        cls = type(self)
+
+        # Stored in the class' own __dict__, so that sub-classes do not see a parent's docs
+        documentation = cls.__dict__.get("_class_documentation")
+        if documentation is None:
+            documentation = inspect.getdoc(self) or ""
+            cls._class_documentation = documentation
+
+        return documentation
 
     def start_server(self) -> None:
         """
@@ -204,9 +232,21 @@ class Adapter:
         process. It is desirable to stick to the provided time, but deviations are permissible if
         necessary due to the way the protocol works.
 
+        The default implementation has nothing to process, it only waits for ``cycle_delay``
+        seconds so that the adapter loop does not spin while idle. The wait ends early when
+        :meth:`wake` is called.
+
         :param cycle_delay: Approximate time spent processing requests.
         """
-        pass
+        self._wakeup.wait(cycle_delay)
+        self._wakeup.clear()
+
+    def wake(self) -> None:
+        """
+        Ends an idle wait in :meth:`handle` early. :class:`AdapterCollection` calls this when
+        the adapter is stopped, so that the adapter loop can react without waiting out the cycle.
+        """
+        self._wakeup.set()
 
 
 @has_log
@@ -232,16 +272,31 @@ class AdapterCollection:
     :param args: List of adapters to add to the container
     """
 
+    __slots__ = (
+        "_adapters",
+        "_adapter_items",
+        "_get_adapters_cache",
+        "_threads",
+        "_running",
+        "_lock",
+    )
+
     def __init__(self, *args: Adapter) -> None:
-        self._adapters = {}
+        # Adapters by protocol for lookups, the tuple keeps the same pairs for iteration
+        self._adapters: dict[str | None, Adapter] = {}
+        self._adapter_items: tuple[tuple[str | None, Adapter], ...] = ()
+        self._get_adapters_cache: dict[
+            tuple[str, ...], tuple[tuple[str | None, Adapter], ...]
+        ] = {}
 
         self._threads = {}
         self._running = {}
         self._lock = threading.Lock()
         self.log: logging.Logger
 
+        # The query cache is still empty here, so it does not need to be reset per adapter
         for adapter in args:
-            self.add_adapter(adapter)
+            self._insert_adapter(adapter)
 
     @property
     def device_lock(self) -> threading.Lock:
@@ -255,7 +310,7 @@ class AdapterCollection:
 
     def set_device(self, new_device: DeviceBase) -> None:
         """Bind the new device to all interfaces managed by the adapters in the collection."""
-        for adapter in self._adapters.values():
+        for _, adapter in self._adapter_items:
             adapter.interface.device = new_device
 
     def add_adapter(self, adapter: Adapter) -> None:
@@ -265,12 +320,17 @@ class AdapterCollection:
 
         :param adapter: Adapter to add to the container
         """
-        if adapter.protocol in self._adapters:
-            raise RuntimeError(
-                "Adapter for protocol '{}' is already registered.".format(adapter.protocol)
-            )
+        self._insert_adapter(adapter)
+        self._get_adapters_cache.clear()
+
+    def _insert_adapter(self, adapter: Adapter) -> None:
+        protocol = adapter.protocol
 
-        self._adapters[adapter.protocol] = adapter
+        if protocol in self._adapters:
+            raise RuntimeError("Adapter for protocol '{}' is already registered.".format(protocol))
+
+        self._adapters[protocol] = adapter
+        self._adapter_items += ((protocol, adapter),)
 
     def remove_adapter(self, protocol: str) -> None:
         """
@@ -285,6 +345,8 @@ class AdapterCollection:
             )
 
         del self._adapters[protocol]
+        self._adapter_items = tuple(self._adapters.items())
+        self._get_adapters_cache.clear()
 
     @property
     def protocols(self) -> list[str]:
@@ -294,61 +356,85 @@ class AdapterCollection:
     def connect(self, *args: str) -> None:
         """
         This method starts an adapter for each specified protocol in a separate thread, if the
-        adapter is not already running.
+        adapter is not already running. All threads are started before waiting for any of
+        them, so the adapters start up concurrently.
 
         :param args: List of protocols for which to start adapters or empty for all.
         """
-        for adapter in self._get_adapters(list(args)):
-            self._start_server(adapter)
+        started = [
+            protocol
+            for protocol, adapter in self._get_adapters(args)
+            if self._start_server(adapter)
+        ]
+
+        # Block until the servers are actually listening, with one deadline for all of them
+        deadline = time.monotonic() + 2.0
+        for protocol in started:
+            if not self._running[protocol].wait(max(deadline - time.monotonic(), 0.0)):
+                raise LewisException("Adapter for '%s' failed to start!" % protocol)
+
+    def _start_server(self, adapter: Adapter) -> bool:
+        if adapter.protocol in self._threads:
+            return False
 
-    def _start_server(self, adapter: Adapter) -> None:
-        if adapter.protocol not in self._threads:
+        if self.log.isEnabledFor(logging.INFO):
             self.log.info("Connecting device interface for protocol '%s'", adapter.protocol)
 
-            adapter_thread = threading.Thread(target=self._adapter_loop, args=(adapter, 0.01))
-            adapter_thread.daemon = True
+        running = threading.Event()
+        adapter_thread = threading.Thread(
+            target=self._adapter_loop, args=(adapter, 0.01, running)
+        )
+        adapter_thread.daemon = True
 
-            self._threads[adapter.protocol] = adapter_thread
-            self._running[adapter.protocol] = threading.Event()
+        self._threads[adapter.protocol] = adapter_thread
+        self._running[adapter.protocol] = running
 
-            adapter_thread.start()
+        adapter_thread.start()
 
-            # Block until server is actually listening
-            self._running[adapter.protocol].wait(2.0)
-            if not self._running[adapter.protocol].is_set():
-                raise LewisException("Adapter for '%s' failed to start!" % adapter.protocol)
+        return True
 
-    def _adapter_loop(self, adapter: Adapter, dt: float) -> None:
+    def _adapter_loop(self, adapter: Adapter, dt: float, running: threading.Event) -> None:
         adapter.device_lock = self._lock  # This ensures that the adapter is using the correct lock
         adapter.start_server()
 
-        self._running[adapter.protocol].set()
+        running.set()
 
         self.log.debug("Starting adapter loop for protocol %s.", adapter.protocol)
-        while self._running[adapter.protocol].is_set():
-            adapter.handle(dt)
+
+        # Bound once, this loop runs for every cycle of the adapter
+        handle, is_running = adapter.handle, running.is_set
+        while is_running():
+            handle(dt)
 
         adapter.stop_server()
 
     def disconnect(self, *args: str) -> None:
         """
-        Stops all adapters for the specified protocols. The method waits for each adapter thread
-        to join, so it might hang if the thread is not terminating correctly.
+        Stops all adapters for the specified protocols. All adapters are signalled to stop before
+        the method waits for each adapter thread to join, so it might hang if a thread is not
+        terminating correctly.
 
         :param args: List of protocols for which to stop adapters or empty for all.
         """
-        for adapter in self._get_adapters(list(args)):
-            self._stop_server(adapter)
+        stopped = [
+            protocol for protocol, adapter in self._get_adapters(args) if self._stop_server(adapter)
+        ]
 
-    def _stop_server(self, adapter: Adapter) -> None:
-        if adapter.protocol in self._threads:
+        for protocol in stopped:
+            self._threads.pop(protocol).join()
+            del self._running[protocol]
+
+    def _stop_server(self, adapter: Adapter) -> bool:
+        if adapter.protocol not in self._threads:
+            return False
+
+        if self.log.isEnabledFor(logging.INFO):
             self.log.info("Disconnecting device interface for protocol '%s'", adapter.protocol)
 
-            self._running[adapter.protocol].clear()
-            self._threads[adapter.protocol].join()
+        self._running[adapter.protocol].clear()
+        adapter.wake()
 
-            del self._threads[adapter.protocol]
-            del self._running[adapter.protocol]
+        return True
 
     def is_connected(self, *args: str) -> bool | dict[str | None, bool]:
         """
@@ -359,17 +445,15 @@ class AdapterCollection:
         :param args: List of protocols for which to start adapters or empty for all.
         :return: Boolean for single adapter or dict of statuses for multiple.
         """
-        status_dict = {
-            adapter.protocol: adapter.is_running for adapter in self._get_adapters(list(args))
-        }
+        items = self._get_adapters(args)
 
         if len(args) == 1:
-            status = list(status_dict.values())[0]
+            status = items[0][1].is_running
             if status is None:
                 return False
             return status
 
-        return status_dict
+        return {protocol: adapter.is_running for protocol, adapter in items}
 
     def configuration(self, *args: str) -> dict[str | None, dict[str, Any]]:
         """
@@ -379,9 +463,10 @@ class AdapterCollection:
         :param args: List of protocols for which to list options, empty for all adapters.
         :return: Dict of protocol: option-dict pairs.
         """
+        # Copies, so that callers can not modify the stored options of an adapter
         return {
-            adapter.protocol: adapter._options._asdict()
-            for adapter in self._get_adapters(list(args))
+            protocol: dict(adapter._options_dict)
+            for protocol, adapter in self._get_adapters(args)
         }
 
     def documentation(self, *args: str) -> str:
@@ -392,22 +477,42 @@ class AdapterCollection:
         :param args: List of protocols for which to get documentation or empty for all.
         :return: Documentation for all selected adapters.
         """
-        return "\n\n".join(adapter.documentation for adapter in self._get_adapters(list(args)))
+        return "\n\n".join(adapter.documentation for _, adapter in self._get_adapters(args))
 
-    def _get_adapters(self, protocols: list[str]) -> list[Adapter]:
+    def _get_adapters(
+        self, protocols: tuple[str, ...]
+    ) -> tuple[tuple[str | None, Adapter], ...]:
         """
         Internal method to map protocols back to adapters. If the list of protocols contains an
         invalid entry (e.g. a protocol for which there is no adapter), a ``RuntimeError``
-        is raised.
+        is raised. Results are cached until adapters are added or removed.
 
-        :param protocols: List of protocols, can be empty to return all adapters.
-        :return: Adapters according to the rules described above.
+        :param protocols: Tuple of protocols, can be empty to return all adapters.
+        :return: (protocol, adapter) pairs according to the rules described above.
         """
-        invalid_protocols = set(protocols) - set(self.protocols)
+        if not protocols:
+            return self._adapter_items
 
-        if invalid_protocols:
-            raise RuntimeError(
-                "No adapter registered for protocols: {}".format(", ".join(invalid_protocols))
-            )
+        adapters = self._get_adapters_cache.get(protocols)
+
+        if adapters is None:
+            items = []
+            invalid_protocols = []
+
+            for proto in protocols:
+                adapter = self._adapters.get(proto)
+
+                if adapter is None:
+                    invalid_protocols.append(proto)
+                else:
+                    items.append((proto, adapter))
+
+            if invalid_protocols:
+                raise RuntimeError(
+                    "No adapter registered for protocols: {}".format(", ".join(invalid_protocols))
+                )
+
+            adapters = tuple(items)
+            self._get_adapters_cache[protocols] = adapters
 
-        return [self._adapters[proto] for proto in protocols or self.protocols]
+        return adapters
@@ -48,14 +48,12 @@ def linear(current, target, rate, dt):
     :param dt: The time for which to calculate the change.
     :return: The new variable value.
     """
-    sign = (target > current) - (target < current)
+    if target > current:
+        new_value = current + rate * dt
+        return target if new_value > target else new_value
 
-    if not sign:
-        return current
+    if target < current:
+        new_value = current - rate * dt
+        return target if new_value < target else new_value
 
-    new_value = current + sign * rate * dt
-
-    if sign * new_value > sign * target:
-        return target
-
-    return new_value
+    return current
@@ -26,8 +26,8 @@ This module provides client code for objects exposed via JSON-RPC over ZMQ.
     in the module :mod:`~lewis.core.control_server`.
 """
 
-import types
-import uuid
+import itertools
+import threading
 
 import zmq
 
@@ -78,27 +78,56 @@ class ControlClient:
     If a timeout is supplied, all underlying network operations time out
     after the specified time (in milliseconds), for no timeout specify ``None``.
 
+    All proxies obtained from one client share its connection. Requests are serialized,
+    so the client and its proxies can be used from multiple threads, which is preferable
+    to creating a separate client per thread.
+
     :param host: Host the control server is running on.
     :param port: Port on which the control server is listening.
     :param timeout: Timeout in milliseconds for ZMQ operations.
     """
 
+    max_proxy_types = 64
+
     def __init__(self, host="127.0.0.1", port="10000", timeout=3000):
         self.timeout = timeout if timeout is not None else -1
 
+        # API descriptions of remote objects by object name
+        self._api_cache = {}
+        self._proxy_types = {}
+
+        # REQ sockets must strictly alternate send and receive, this allows sharing the client
+        self._socket_lock = threading.Lock()
+
+        # Replies are only ever matched against requests of this client, a counter is unique
+        # enough and much cheaper than generating random UUIDs.
+        self._request_ids = itertools.count(1)
+
         self._socket = self._get_zmq_req_socket()
 
         self._connection_string = "tcp://{0}:{1}".format(host, port)
         self._socket.connect(self._connection_string)
 
+        self._timeout_message = "The ZMQ connection to {} timed out after {:.2f}s.".format(
+            self._connection_string, self.timeout / 1000
+        )
+
     def _get_zmq_req_socket(self):
-        context = zmq.Context()
-        context.setsockopt(zmq.REQ_CORRELATE, 1)
-        context.setsockopt(zmq.REQ_RELAXED, 1)
-        context.setsockopt(zmq.SNDTIMEO, self.timeout)
-        context.setsockopt(zmq.RCVTIMEO, self.timeout)
-        context.setsockopt(zmq.LINGER, 0)
-        return context.socket(zmq.REQ)
+        # All clients share the process-wide context, so the options are set per socket
+        zmq_socket = zmq.Context.instance().socket(zmq.REQ)
+        zmq_socket.setsockopt(zmq.REQ_CORRELATE, 1)
+        zmq_socket.setsockopt(zmq.REQ_RELAXED, 1)
+        zmq_socket.setsockopt(zmq.SNDTIMEO, self.timeout)
+        zmq_socket.setsockopt(zmq.RCVTIMEO, self.timeout)
+        zmq_socket.setsockopt(zmq.LINGER, 0)
+        return zmq_socket
+
+    def close(self):
+        """
+        Closes the connection to the server. Proxies obtained from this client can not be used
+        afterwards.
+        """
+        self._socket.close()
 
     def json_rpc(self, method, *args):
         """
@@ -106,35 +135,114 @@ class ControlClient:
         the RPC (JSON-RPC 2.0 format) to the supplied method with the supplied arguments.
         Then it waits for a reply from the server and blocks until it has received
         a JSON-response. The method returns the response and the id it used to tag
-        the original request, which is a random UUID (uuid.uuid4).
+        the original request, which is unique for the requests of this client.
 
         :param method: Method to call on remote.
         :param args: Arguments to method call.
         :return: JSON result and request id.
         """
-        request_id = str(uuid.uuid4())
+        request_id = str(next(self._request_ids))
 
         try:
-            self._socket.send_json(
-                {"method": method, "params": args, "jsonrpc": "2.0", "id": request_id}
-            )
+            with self._socket_lock:
+                self._socket.send_json(
+                    {"method": method, "params": args, "jsonrpc": "2.0", "id": request_id}
+                )
 
-            return self._socket.recv_json(), request_id
+                return self._socket.recv_json(), request_id
         except zmq.error.Again:
-            raise ProtocolException(
-                "The ZMQ connection to {} timed out after {:.2f}s.".format(
-                    self._connection_string, self.timeout / 1000
-                )
-            )
+            raise ProtocolException(self._timeout_message)
+
+    def json_rpc_batch(self, calls):
+        """
+        Submits several RPCs to the server as one JSON-RPC 2.0 batch request, so that they only
+        take a single round-trip. Each element of ``calls`` is a tuple of the method name and
+        a sequence of arguments. The method returns a list with the same structure as the
+        return value of :meth:`json_rpc`, one (response, request id) pair per call in the
+        order of ``calls``.
+
+        :param calls: Sequence of (method, args) tuples.
+        :return: List of JSON results and request ids.
+        """
+        requests = [
+            {"method": method, "params": tuple(args), "jsonrpc": "2.0", "id": request_id}
+            for (method, args), request_id in zip(calls, map(str, self._request_ids))
+        ]
+
+        try:
+            with self._socket_lock:
+                self._socket.send_json(requests)
+                responses = self._socket.recv_json()
+        except zmq.error.Again:
+            raise ProtocolException(self._timeout_message)
+
+        if not isinstance(responses, list):
+            raise ProtocolException("JSON-RPC batch request was rejected by the server.")
+
+        # The server may answer the requests of a batch in any order
+        responses_by_id = {response.get("id"): response for response in responses}
+
+        return [
+            (responses_by_id.get(request["id"], {}), request["id"]) for request in requests
+        ]
 
     def get_object(self, object_name=""):
-        api, request_id = self.json_rpc(object_name + ":api")
+        """
+        Returns a proxy for the object exposed under the supplied name on the server (empty for
+        the top level object). The API of each object is only requested from the server once,
+        if the exposed objects change on the server, :meth:`invalidate_api` must be called.
+
+        :param object_name: Object name on the server.
+        :return: Proxy object for the remote object.
+        """
+        api = self._api_cache.get(object_name)
 
-        if "result" not in api or api["id"] != request_id:
+        if api is None:
+            response, request_id = self.json_rpc(object_name + ":api")
+            api = self._store_api(object_name, response, request_id)
+
+        return self._create_object_proxy(object_name, api)
+
+    def invalidate_api(self, object_name=None):
+        """
+        Drops the cached API of the supplied object name so that it is requested from the server
+        again on next access. If no name is supplied, the cached APIs of all objects and the
+        proxy classes created for them are dropped.
+
+        :param object_name: Object name on the server or None for all objects.
+        """
+        if object_name is None:
+            self._api_cache.clear()
+            self._proxy_types.clear()
+        else:
+            self._api_cache.pop(object_name, None)
+
+    def _store_api(self, object_name, response, request_id):
+        if "result" not in response or response["id"] != request_id:
             raise ProtocolException("Failed to retrieve API of remote object.")
 
-        object_type = type(str(api["result"]["class"]), (ObjectProxy,), {})
-        methods = api["result"]["methods"]
+        api = self._api_cache[object_name] = response["result"]
+        return api
+
+    def _create_object_proxy(self, object_name, api):
+        methods = api["methods"]
+
+        _, properties = ObjectProxy._split_members(methods)
+
+        # Proxies of remote objects with the same type and properties share one class
+        type_key = (str(api["class"]), frozenset(properties))
+        object_type = self._proxy_types.get(type_key)
+
+        if object_type is None:
+            # The oldest proxy type is dropped, so that changing APIs can not grow this forever
+            if len(self._proxy_types) >= self.max_proxy_types:
+                del self._proxy_types[next(iter(self._proxy_types))]
+
+            object_type = self._proxy_types[type_key] = type(
+                type_key[0],
+                (ObjectProxy,),
+                {prop: ObjectProxy._create_property_proxy(prop) for prop in properties},
+            )
 
         glue = "." if object_name else ""
         return object_type(self, methods, object_name + glue)
@@ -145,15 +253,24 @@ class ControlClient:
         for top level), this method returns a dictionary of these objects stored under their
         names on the server.
 
-        This function performs n + 1 calls to the server, where n is the number of objects.
+        The APIs of all objects in the collection are requested in a single batch, so that this
+        function performs at most three round-trips to the server, independent of the number of
+        objects. APIs that have been requested before are not requested again.
 
         :param object_name: Object name on the server. This is required if the object collection
                             is not the top level object.
         """
 
         object_names = self.get_object(object_name).get_objects()
+        missing_names = [obj for obj in object_names if obj not in self._api_cache]
+
+        if missing_names:
+            responses = self.json_rpc_batch([(obj + ":api", ()) for obj in missing_names])
+
+            for obj, (response, request_id) in zip(missing_names, responses):
+                self._store_api(obj, response, request_id)
 
-        return {obj: self.get_object(obj) for obj in object_names}
+        return {obj: self._create_object_proxy(obj, self._api_cache[obj]) for obj in object_names}
 
 
 class ObjectProxy:
@@ -232,35 +349,59 @@ class ObjectProxy:
                 raise ProtocolException(response["error"]["message"])
 
     def _add_member_proxies(self, members):
-        for member in [str(m) for m in members]:
+        methods, self._properties = self._split_members(members)
+
+        for method in methods:
+            setattr(self, method, self._create_method_proxy(method))
+
+        # ControlClient creates proxy types with the properties already in the class namespace
+        object_type = type(self)
+        for prop in self._properties:
+            if prop not in object_type.__dict__:
+                setattr(object_type, prop, self._create_property_proxy(prop))
+
+    @staticmethod
+    def _split_members(members):
+        """
+        Sorts the exposed members of a remote object into method names and property names.
+
+        :param members: List of strings as returned by the remote object's API.
+        :return: Tuple of method names (list) and property names (set).
+        """
+        methods = []
+        properties = set()
+
+        for member in map(str, members):
             if ":set" in member or ":get" in member:
-                self._properties.add(member.split(":")[-2].split(".")[-1])
+                properties.add(member.split(":")[-2].split(".")[-1])
             else:
-                setattr(self, member, self._create_method_proxy(member))
+                methods.append(member)
 
-        for prop in self._properties:
-            setattr(
-                type(self),
-                prop,
-                property(
-                    self._create_getter_proxy(prop), self._create_setter_proxy(prop)
-                ),
-            )
+        return methods, properties
+
+    @classmethod
+    def _create_property_proxy(cls, property_name):
+        return property(
+            cls._create_getter_proxy(property_name), cls._create_setter_proxy(property_name)
+        )
 
-    def _create_getter_proxy(self, property_name):
+    @staticmethod
+    def _create_getter_proxy(property_name):
         def getter(obj):
             return obj._make_request(property_name + ":get")
 
         return getter
 
-    def _create_setter_proxy(self, property_name):
+    @staticmethod
+    def _create_setter_proxy(property_name):
         def setter(obj, value):
             return obj._make_request(property_name + ":set", value)
 
         return setter
 
     def _create_method_proxy(self, method_name):
-        def method_wrapper(obj, *args):
-            return obj._make_request(method_name, *args)
+        # Stored on the instance, so the closure can refer to it directly instead of binding
+        def method_wrapper(*args):
+            return self._make_request(method_name, *args)
 
-        return types.MethodType(method_wrapper, self)
+        return method_wrapper
@@ -28,17 +28,26 @@ this infrastructure in :class:`~lewis.core.simulation.Simulation`.
 
 """
 
-import inspect
+import functools
 import json
+import logging
+import operator
 import socket
 
 import zmq
 from jsonrpc import JSONRPCResponseManager
+from jsonrpc.jsonrpc2 import JSONRPC20BatchResponse
 
 from lewis.core.exceptions import LewisException
 from lewis.core.logging import has_log
 
 
+@functools.lru_cache(maxsize=None)
+def _inherited_members(cls):
+    # dir() of a class includes its bases, so the direct bases cover the whole MRO
+    return frozenset().union(*(dir(base) for base in cls.__bases__))
+
+
 class ExposedObject:
     """
     ExposedObject is a class that makes it easy to expose an object via the
@@ -77,6 +86,8 @@ class ExposedObject:
     :param lock: ``threading.Lock`` that is used when accessing ``obj``.
     """
 
+    __slots__ = ("_object", "_function_map", "_lock", "_api")
+
     def __init__(
         self, obj, members=None, exclude=None, exclude_inherited=False, lock=None
     ):
@@ -85,14 +96,14 @@ class ExposedObject:
         self._object = obj
         self._function_map = {}
         self._lock = lock
+        self._api = None
 
         self._add_function(":api", self.get_api)
 
         exposed_members = members if members else self._public_members()
-        exclude = list(exclude or [])
+        exclude = set(exclude or ())
         if exclude_inherited:
-            for base in inspect.getmro(type(obj))[1:]:
-                exclude += dir(base)
+            exclude |= _inherited_members(type(obj))
 
         for method in exposed_members:
             if method not in exclude:
@@ -128,10 +139,14 @@ class ExposedObject:
 
         :return: A dictionary describing the exposed API (consisting of a class name and methods).
         """
-        return {
-            "class": type(self._object).__name__,
-            "methods": list(self._function_map.keys()),
-        }
+        # The API only changes when functions are added or removed, which resets this cache
+        if self._api is None:
+            self._api = {
+                "class": type(self._object).__name__,
+                "methods": list(self._function_map.keys()),
+            }
+
+        return self._api
 
     def __getitem__(self, item):
         return self._function_map[item]
@@ -146,9 +161,12 @@ class ExposedObject:
         return item in self._function_map
 
     def _add_property(self, name):
-        self._add_function("{}:get".format(name), lambda: getattr(self._object, name))
+        # Partials of builtins, these are called without going through Python-level frames
+        self._add_function(
+            "{}:get".format(name), functools.partial(operator.attrgetter(name), self._object)
+        )
         self._add_function(
-            "{}:set".format(name), lambda value: setattr(self._object, name, value)
+            "{}:set".format(name), functools.partial(setattr, self._object, name)
         )
 
     def _add_function(self, name, function):
@@ -156,20 +174,23 @@ class ExposedObject:
             raise TypeError("Only callable objects can be exposed.")
 
         if self._lock is not None:
+            function = self._create_locking_wrapper(function, self._lock)
 
-            def create_locking_wrapper(f):
-                def locking_wrapper_function(*args, **kwargs):
-                    with self._lock:
-                        return f(*args, **kwargs)
-
-                return locking_wrapper_function
+        self._function_map[name] = function
+        self._api = None
 
-            function = create_locking_wrapper(function)
+    @staticmethod
+    def _create_locking_wrapper(function, lock):
+        # The lock is bound in the closure, so calls do not have to look it up on the instance
+        def locking_wrapper_function(*args, **kwargs):
+            with lock:
+                return function(*args, **kwargs)
 
-        self._function_map[name] = function
+        return locking_wrapper_function
 
     def _remove_function(self, name):
         del self._function_map[name]
+        self._api = None
 
 
 class ExposedObjectCollection(ExposedObject):
@@ -196,9 +217,12 @@ class ExposedObjectCollection(ExposedObject):
     :param named_objects: Dictionary of of name: object pairs.
     """
 
+    __slots__ = ("_object_map", "_object_functions")
+
     def __init__(self, named_objects):
         super(ExposedObjectCollection, self).__init__(self, ("get_objects",))
         self._object_map = {}
+        self._object_functions = {}
 
         if named_objects:
             for name, obj in named_objects.items():
@@ -222,9 +246,18 @@ class ExposedObjectCollection(ExposedObject):
             obj if isinstance(obj, ExposedObject) else ExposedObject(obj)
         )
 
-        for method_name in exposed_object:
-            glue = "." if not method_name.startswith(":") else ""
-            self._add_function(name + glue + method_name, exposed_object[method_name])
+        # The functions have been validated (and wrapped) by exposed_object already, and the
+        # collection itself does not lock, so they can go into the map directly.
+        dotted_name = name + "."
+        functions = {
+            (name if method_name[:1] == ":" else dotted_name) + method_name: function
+            for method_name, function in exposed_object._function_map.items()
+        }
+        self._function_map.update(functions)
+        self._api = None
+
+        # Remembered per object so that remove_object does not have to scan the whole map
+        self._object_functions[name] = tuple(functions)
 
     def remove_object(self, name):
         """
@@ -236,9 +269,8 @@ class ExposedObjectCollection(ExposedObject):
         if name not in self._object_map:
             raise RuntimeError("No object with name {} is registered.".format(name))
 
-        for fn_name in list(self._function_map.keys()):
-            if fn_name.startswith(name + ".") or fn_name.startswith(name + ":"):
-                self._remove_function(fn_name)
+        for fn_name in self._object_functions.pop(name):
+            self._remove_function(fn_name)
 
         del self._object_map[name]
 
@@ -258,7 +290,8 @@ class ControlServer:
     instance of :class:`ExposedObject`, that is used directly.
 
     Each time process is called, the server tries to get request data and responds to that.
-    If there is no data, the method does nothing.
+    All pending requests, up to ``max_batch_size``, are handled in one call. If there is no
+    data, the method does nothing.
 
     Please note that this RPC-service comes without any security, authentication, etc.
     Only use it to expose objects on a trusted network and be aware that anyone on that
@@ -269,6 +302,8 @@ class ControlServer:
     :param connection_string: String with host:port pair for binding control server.
     """
 
+    max_batch_size = 100
+
     def __init__(self, object_map, connection_string):
         super(ControlServer, self).__init__()
 
@@ -297,6 +332,8 @@ class ControlServer:
             self._exposed_object = ExposedObjectCollection(object_map)
 
         self._socket = None
+        self._poller = None
+        self._receive_timeout = 100
 
     @property
     def is_running(self):
@@ -319,9 +356,13 @@ class ControlServer:
         if self._socket is None:
             context = zmq.Context()
             self._socket = context.socket(zmq.REP)
-            self._socket.setsockopt(zmq.RCVTIMEO, 100)
+            self._socket.setsockopt(zmq.RCVTIMEO, self._receive_timeout)
             self._socket.bind("tcp://{0}:{1}".format(self.host, self.port))
 
+            # Socket.poll constructs a new Poller on each call, this one is reused instead
+            self._poller = zmq.Poller()
+            self._poller.register(self._socket, zmq.POLLIN)
+
             self.log.info("Listening on %s:%s", self.host, self.port)
 
     def _unhandled_exception_response(self, request_id, exception):
@@ -361,21 +402,44 @@ class ControlServer:
                 "The server has not been started yet, use start_server to do so."
             )
 
-        try:
-            request = self._socket.recv_unicode(
-                flags=zmq.NOBLOCK if not blocking else 0
-            )
+        # Polling first, so that the common case of no pending request does not raise zmq.Again
+        if not self._poller.poll(self._receive_timeout if blocking else 0):
+            return
 
+        # All pending requests are handled, so that a backlog does not take many cycles to clear
+        for _ in range(self.max_batch_size):
+            try:
+                request = self._socket.recv_unicode(flags=zmq.NOBLOCK)
+            except zmq.Again:
+                break
+
+            self._process_request(request)
+
+    def _process_request(self, request):
+        debug = self.log.isEnabledFor(logging.DEBUG)
+        if debug:
             self.log.debug("Got request %s", request)
 
-            try:
-                response = JSONRPCResponseManager.handle(request, self._exposed_object)
-                self._socket.send_unicode(response.json)
+        response = JSONRPCResponseManager.handle(request, self._exposed_object)
 
-                self.log.debug("Sent response %s", response.json)
-            except TypeError as e:
-                self._socket.send_json(
-                    self._unhandled_exception_response(json.loads(request)["id"], e)
-                )
-        except zmq.Again:
-            pass
+        if isinstance(response, JSONRPC20BatchResponse):
+            # Entries are serialized separately, so that a result that can not be serialized
+            # only turns its own entry into an error response
+            response_json = "[{}]".format(
+                ",".join(self._serialize_response(entry) for entry in response.responses)
+            )
+        else:
+            response_json = self._serialize_response(response)
+
+        self._socket.send_unicode(response_json)
+
+        if debug:
+            self.log.debug("Sent response %s", response_json)
+
+    def _serialize_response(self, response):
+        try:
+            # Serialized only once, response.json encodes the response on every access
+            return response.json
+        except TypeError as e:
+            # The request id is taken from the response, so the request is not parsed again
+            return json.dumps(self._unhandled_exception_response(response.data["id"], e))
@@ -25,10 +25,11 @@ produces factory-like objects that create device instances and interfaces based
 """
 
 import importlib
+import inspect
 
 from lewis.core.exceptions import LewisException
 from lewis.core.logging import has_log
-from lewis.core.utils import get_members, get_submodules
+from lewis.core.utils import get_members, get_submodule_names, get_submodules
 
 
 @has_log
@@ -91,6 +92,10 @@ class InterfaceBase:
         pass
 
 
+# Devices defined in these modules are base classes, not devices
+_builtin_device_modules = frozenset(("lewis.devices", "lewis.core.devices"))
+
+
 def is_device(obj):
     """
     Returns True if obj is a device type (derived from DeviceBase), but not defined in
@@ -102,10 +107,14 @@ def is_device(obj):
     return (
         isinstance(obj, type)
         and issubclass(obj, DeviceBase)
-        and obj.__module__ not in ("lewis.devices", "lewis.core.devices")
+        and obj.__module__ not in _builtin_device_modules
     )
 
 
+# Interfaces defined in these modules are base classes, not interfaces of a device
+_builtin_interface_modules = ("lewis.core.devices", "lewis.adapters")
+
+
 def is_interface(obj):
     """
     Returns True if obj is an interface (derived from :class:`InterfaceBase`), but not defined in
@@ -117,10 +126,7 @@ def is_interface(obj):
     return (
         isinstance(obj, type)
         and issubclass(obj, InterfaceBase)
-        and not (
-            obj.__module__.startswith("lewis.core.devices")
-            or obj.__module__.startswith("lewis.adapters")
-        )
+        and not obj.__module__.startswith(_builtin_interface_modules)
     )
 
 
@@ -184,9 +190,16 @@ class DeviceBuilder:
 
         submodules = get_submodules(self._module)
 
+        # The defaults are fixed after discovery, the setups already depend on the device type
         self._device_types = self._discover_devices(submodules.get("devices"))
+        self._default_device_type = (
+            self._device_types[0] if len(self._device_types) == 1 else None
+        )
         self._setups = self._discover_setups(submodules.get("setups"))
         self._interfaces = self._discover_interfaces(submodules.get("interfaces"))
+        self._default_protocol = (
+            next(iter(self._interfaces)) if len(self._interfaces) == 1 else None
+        )
 
         self.log.debug(
             "Discovered the following items in '%s': Devices: %s; Setups: %s; Interfaces: %s",
@@ -296,10 +309,7 @@ class DeviceBuilder:
         If the module only defines one device type, it is the default device type. It is used
         whenever a setup does not provide a ``device_type``.
         """
-        if len(self.device_types) == 1:
-            return self.device_types[0]
-
-        return None
+        return self._default_device_type
 
     @property
     def interfaces(self):
@@ -318,10 +328,7 @@ class DeviceBuilder:
     @property
     def default_protocol(self):
         """In case only one protocol exists for the device, this is the default protocol."""
-        if len(self.protocols) == 1:
-            return self.protocols[0]
-
-        return None
+        return self._default_protocol
 
     @property
     def setups(self):
@@ -413,7 +420,8 @@ class DeviceRegistry:
     """
     This class takes the name of a module and constructs a :class:`DeviceBuilder` from
     each sub-module. The available devices can be queried and a DeviceBuilder can be
-    obtained for each device:
+    obtained for each device. Device modules are only imported when their DeviceBuilder
+    is requested for the first time:
 
     .. sourcecode:: Python
 
@@ -439,10 +447,13 @@ class DeviceRegistry:
                 "See also the -a option of lewis.".format(device_module)
             )
 
-        self._devices = {
-            name: DeviceBuilder(module)
-            for name, module in get_submodules(self._device_module).items()
-        }
+        # Builders are created on demand, so that only the devices that are used get imported
+        self._devices = dict.fromkeys(
+            [
+                *get_members(self._device_module, inspect.ismodule),
+                *get_submodule_names(self._device_module),
+            ]
+        )
 
         self.log.debug(
             "Devices loaded from '%s': %s",
@@ -473,7 +484,7 @@ class DeviceRegistry:
         :return: :class:`DeviceBuilder`-object for requested device.
         """
         try:
-            return self._devices[name]
+            builder = self._devices[name]
         except KeyError:
             raise LewisException(
                 "No device with the name '{}' could be found. "
@@ -482,3 +493,23 @@ class DeviceRegistry:
                     name, "\n    ".join(self.devices)
                 )
             )
+
+        if builder is None:
+            builder = self._devices[name] = DeviceBuilder(self._import_device_module(name))
+
+        return builder
+
+    def _import_device_module(self, name):
+        module = getattr(self._device_module, name, None)
+
+        if inspect.ismodule(module):
+            return module
+
+        try:
+            return importlib.import_module(
+                ".{}".format(name), package=self._device_module.__name__
+            )
+        except ImportError as import_error:
+            raise LewisException(
+                "Failed to import device '{}': {}".format(name, import_error)
+            )
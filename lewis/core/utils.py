@@ -53,27 +53,40 @@ def get_submodules(module) -> dict[str, ModuleType]:
 
     submodules = get_members(module, inspect.ismodule)
 
+    for module_name in get_submodule_names(module):
+        try:
+            submodules[module_name] = importlib.import_module(
+                ".{}".format(module_name), package=module.__name__
+            )
+        except ImportError as import_error:
+            # This is necessary in case random directories are in the path or things can
+            # just not be imported due to other ImportErrors.
+            get_submodules.log.error(
+                "ImportError for {module}: {error}".format(module=module_name, error=import_error)
+            )
+
+    return submodules
+
+
+def get_submodule_names(module) -> list[str]:
+    """
+    This function returns the names of all sub-modules in the directory of the supplied
+    package without importing them. Names are determined by :func:`extract_module_name`.
+    If the module is not a package, an empty list is returned.
+
+    :param module: Module object from which to list sub-modules.
+    :return: List of sub-module names.
+    """
     module_path = list(getattr(module, "__path__", [None]))[0]
 
-    if module_path is not None:
-        for item in listdir(module_path):
-            module_name = extract_module_name(osp.join(module_path, item))
-
-            if module_name is not None:
-                try:
-                    submodules[module_name] = importlib.import_module(
-                        ".{}".format(module_name), package=module.__name__
-                    )
-                except ImportError as import_error:
-                    # This is necessary in case random directories are in the path or things can
-                    # just not be imported due to other ImportErrors.
-                    get_submodules.log.error(
-                        "ImportError for {module}: {error}".format(
-                            module=module_name, error=import_error
-                        )
-                    )
+    if module_path is None:
+        return []
 
-    return submodules
+    module_names = (
+        extract_module_name(osp.join(module_path, item)) for item in listdir(module_path)
+    )
+
+    return [module_name for module_name in module_names if module_name is not None]
 
 
 def get_members(obj, predicate=None):
@@ -138,8 +151,8 @@ def dict_strict_update(base_dict, update_dict):
     :param base_dict: The dict that is to be updated. This dict is modified.
     :param update_dict: The dict containing the new values.
     """
-    additional_keys = set(update_dict.keys()) - set(base_dict.keys())
-    if len(additional_keys) > 0:
+    additional_keys = update_dict.keys() - base_dict.keys()
+    if additional_keys:
         raise RuntimeError(
             "The update dictionary contains keys that are not part of "
             "the base dictionary: {}".format(str(additional_keys)),
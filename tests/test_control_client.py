@@ -38,33 +38,36 @@ class TestControlClient(unittest.TestCase):
 
         mock_zmq_context.assert_has_calls(
             [
-                call().setsockopt(zmq.SNDTIMEO, timeout),
-                call().setsockopt(zmq.RCVTIMEO, timeout),
+                call.instance().socket().setsockopt(zmq.SNDTIMEO, timeout),
+                call.instance().socket().setsockopt(zmq.RCVTIMEO, timeout),
             ]
         )
 
-    @patch("uuid.uuid4")
+    @patch("zmq.Context")
+    def test_clients_share_zmq_context(self, mock_zmq_context):
+        ControlClient(host="127.0.0.1", port="10002")
+        ControlClient(host="127.0.0.1", port="10003")
+
+        mock_zmq_context.assert_not_called()
+        self.assertEqual(mock_zmq_context.instance.call_count, 2)
+
     @patch("lewis.core.control_client.ControlClient._get_zmq_req_socket")
-    def test_json_rpc_timeout_raises(self, mock_socket, mock_uuid):
+    def test_json_rpc_timeout_raises(self, mock_socket):
         def zmq_again(self):
             raise zmq.error.Again()
 
         raising_send = Mock(side_effect=zmq_again)
-        mock_uuid.return_value = "2"
 
         connection = ControlClient(host="127.0.0.1", port="10001")
         connection._socket.send_json = raising_send
         self.assertRaises(ProtocolException, connection.json_rpc, "foo")
 
         raising_send.assert_called_once_with(
-            {"method": "foo", "params": (), "jsonrpc": "2.0", "id": "2"}
+            {"method": "foo", "params": (), "jsonrpc": "2.0", "id": "1"}
         )
 
-    @patch("uuid.uuid4")
     @patch("lewis.core.control_client.ControlClient._get_zmq_req_socket")
-    def test_json_rpc(self, mock_socket, mock_uuid):
-        mock_uuid.return_value = "2"
-
+    def test_json_rpc(self, mock_socket):
         connection = ControlClient(host="127.0.0.1", port="10001")
         connection.json_rpc("foo")
 
@@ -73,12 +76,36 @@ class TestControlClient(unittest.TestCase):
                 call(),
                 call().connect("tcp://127.0.0.1:10001"),
                 call().send_json(
-                    {"method": "foo", "params": (), "jsonrpc": "2.0", "id": "2"}
+                    {"method": "foo", "params": (), "jsonrpc": "2.0", "id": "1"}
                 ),
                 call().recv_json(),
             ]
         )
 
+    @patch("lewis.core.control_client.ControlClient._get_zmq_req_socket")
+    def test_json_rpc_uses_unique_request_ids(self, mock_socket):
+        connection = ControlClient(host="127.0.0.1", port="10001")
+
+        request_ids = [connection.json_rpc("foo")[1] for _ in range(3)]
+
+        mock_socket.return_value.recv_json.return_value = []
+        request_ids += [request_id for _, request_id in connection.json_rpc_batch([("a", ())] * 3)]
+
+        self.assertEqual(len(set(request_ids)), 6)
+
+    @patch("lewis.core.control_client.ControlClient._get_zmq_req_socket")
+    def test_json_rpc_holds_socket_lock(self, mock_socket):
+        connection = ControlClient(host="127.0.0.1", port="10001")
+
+        def check_locked(*args):
+            self.assertTrue(connection._socket_lock.locked())
+
+        mock_socket.return_value.send_json.side_effect = check_locked
+        mock_socket.return_value.recv_json.side_effect = check_locked
+
+        connection.json_rpc("foo")
+        self.assertFalse(connection._socket_lock.locked())
+
     @patch("lewis.core.control_client.ControlClient._get_zmq_req_socket")
     def test_get_remote_object_works(self, mock_socket):
         client = ControlClient(host="127.0.0.1", port="10001")
@@ -102,6 +129,99 @@ class TestControlClient(unittest.TestCase):
 
             json_rpc_mock.assert_has_calls([call(":api")])
 
+    @patch("lewis.core.control_client.ControlClient._get_zmq_req_socket")
+    def test_get_remote_object_creates_properties_once(self, mock_socket):
+        client = ControlClient(host="127.0.0.1", port="10001")
+
+        with patch.object(client, "json_rpc") as json_rpc_mock, patch.object(
+            ObjectProxy,
+            "_create_property_proxy",
+            wraps=ObjectProxy._create_property_proxy,
+        ) as property_proxy_mock:
+            json_rpc_mock.return_value = (
+                {"id": 2, "result": {"class": "Test", "methods": ["a:get", "a:set", "b:get"]}},
+                2,
+            )
+
+            obj = client.get_object()
+
+            self.assertEqual(property_proxy_mock.call_count, 2)
+            self.assertEqual(obj._properties, {"a", "b"})
+            self.assertIsInstance(type(obj).__dict__["a"], property)
+
+    @patch("lewis.core.control_client.ControlClient._get_zmq_req_socket")
+    def test_remote_objects_of_same_type_share_proxy_class(self, mock_socket):
+        client = ControlClient(host="127.0.0.1", port="10001")
+
+        def api(name, methods):
+            return {"id": name, "result": {"class": "Test", "methods": methods}}, name
+
+        with patch.object(client, "json_rpc_batch") as json_rpc_batch_mock, patch.object(
+            client, "get_object"
+        ) as get_object_mock:
+            get_object_mock.return_value.get_objects.return_value = ["a", "b", "c"]
+            json_rpc_batch_mock.return_value = [
+                api("a", ["x:get", "x:set", "foo"]),
+                api("b", ["x:get", "x:set", "bar"]),
+                api("c", ["y:get"]),
+            ]
+
+            objects = client.get_object_collection()
+
+        self.assertIs(type(objects["a"]), type(objects["b"]))
+        self.assertIsNot(type(objects["a"]), type(objects["c"]))
+        self.assertTrue(hasattr(objects["a"], "foo"))
+        self.assertFalse(hasattr(objects["b"], "foo"))
+
+    @patch("lewis.core.control_client.ControlClient._get_zmq_req_socket")
+    def test_invalidate_api_drops_proxy_classes(self, mock_socket):
+        client = ControlClient(host="127.0.0.1", port="10001")
+
+        with patch.object(client, "json_rpc") as json_rpc_mock:
+            json_rpc_mock.return_value = (
+                {"id": 1, "result": {"class": "Test", "methods": ["a:get"]}},
+                1,
+            )
+
+            first = client.get_object("foo")
+            self.assertIs(type(client.get_object("foo")), type(first))
+
+            client.invalidate_api()
+            self.assertIsNot(type(client.get_object("foo")), type(first))
+
+    @patch("lewis.core.control_client.ControlClient._get_zmq_req_socket")
+    def test_proxy_classes_are_bounded(self, mock_socket):
+        client = ControlClient(host="127.0.0.1", port="10001")
+        client.max_proxy_types = 2
+
+        for prop in ["a", "b", "c"]:
+            client._create_object_proxy("foo", {"class": "Test", "methods": [prop + ":get"]})
+
+        self.assertEqual(len(client._proxy_types), 2)
+        self.assertNotIn(("Test", frozenset(["a"])), client._proxy_types)
+
+    @patch("lewis.core.control_client.ControlClient._get_zmq_req_socket")
+    def test_get_remote_object_caches_api(self, mock_socket):
+        client = ControlClient(host="127.0.0.1", port="10001")
+
+        with patch.object(client, "json_rpc") as json_rpc_mock:
+            json_rpc_mock.return_value = (
+                {"id": 2, "result": {"class": "Test", "methods": ["setTest"]}},
+                2,
+            )
+
+            client.get_object("foo")
+            client.get_object("foo")
+            self.assertEqual(json_rpc_mock.call_count, 1)
+
+            client.invalidate_api("foo")
+            client.get_object("foo")
+            self.assertEqual(json_rpc_mock.call_count, 2)
+
+            client.invalidate_api()
+            client.get_object("foo")
+            self.assertEqual(json_rpc_mock.call_count, 3)
+
     @patch("lewis.core.control_client.ControlClient._get_zmq_req_socket")
     def test_get_remote_object_raises_exception(self, mock_socket):
         client = ControlClient(host="127.0.0.1", port="10001")
@@ -109,9 +229,10 @@ class TestControlClient(unittest.TestCase):
         with patch.object(client, "json_rpc") as json_rpc_mock:
             json_rpc_mock.return_value = ({"id": 2}, 2)
 
+            self.assertRaises(ProtocolException, client.get_object)
             self.assertRaises(ProtocolException, client.get_object)
 
-            json_rpc_mock.assert_has_calls([call(":api")])
+            json_rpc_mock.assert_has_calls([call(":api"), call(":api")])
 
     @patch("lewis.core.control_client.ControlClient._get_zmq_req_socket")
     def test_get_remote_object_collection(self, mock_socket):
@@ -120,20 +241,43 @@ class TestControlClient(unittest.TestCase):
         returned_object = Mock()
         returned_object.get_objects = Mock(return_value=["obj1", "obj2"])
 
-        with patch.object(client, "get_object") as get_object_mock:
-            get_object_mock.side_effect = [
-                returned_object,
-                "obj1_object",
-                "obj2_object",
-            ]
+        def api(name):
+            return {"id": name, "result": {"class": name, "methods": ["a:get"]}}, name
+
+        with patch.object(client, "get_object") as get_object_mock, patch.object(
+            client, "json_rpc_batch"
+        ) as json_rpc_batch_mock:
+            get_object_mock.return_value = returned_object
+            json_rpc_batch_mock.return_value = [api("obj1"), api("obj2")]
 
             objects = client.get_object_collection()
 
-            self.assertTrue("obj1" in objects)
-            self.assertTrue("obj2" in objects)
+            self.assertEqual(set(objects), {"obj1", "obj2"})
+            self.assertEqual(type(objects["obj2"]).__name__, "obj2")
 
             returned_object.get_objects.assert_has_calls([call()])
-            get_object_mock.assert_has_calls([call(""), call("obj1"), call("obj2")])
+            get_object_mock.assert_called_once_with("")
+            json_rpc_batch_mock.assert_called_once_with([("obj1:api", ()), ("obj2:api", ())])
+
+    @patch("lewis.core.control_client.ControlClient._get_zmq_req_socket")
+    def test_json_rpc_batch_matches_responses_by_id(self, mock_socket):
+        mock_socket.return_value.recv_json.return_value = [
+            {"id": "2", "result": "b"},
+            {"id": "1", "result": "a"},
+        ]
+
+        connection = ControlClient(host="127.0.0.1", port="10001")
+        responses = connection.json_rpc_batch([("foo", ()), ("bar", (3,))])
+
+        mock_socket.return_value.send_json.assert_called_once_with(
+            [
+                {"method": "foo", "params": (), "jsonrpc": "2.0", "id": "1"},
+                {"method": "bar", "params": (3,), "jsonrpc": "2.0", "id": "2"},
+            ]
+        )
+        self.assertEqual(
+            responses, [({"id": "1", "result": "a"}, "1"), ({"id": "2", "result": "b"}, "2")]
+        )
 
 
 class TestObjectProxy(unittest.TestCase):
@@ -17,11 +17,13 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 # *********************************************************************
 
+import json
 import socket
 import unittest
 
 import zmq
 from mock import Mock, call, patch
+from parameterized import parameterized
 
 from lewis.core.control_server import (
     ControlServer,
@@ -104,6 +106,17 @@ class TestRPCObject(unittest.TestCase):
         for method in expected_methods:
             self.assertTrue(method in rpc_object)
 
+    def test_members_of_all_bases_are_not_exposed(self):
+        class OtherBase:
+            d = 4
+
+        class MultipleChild(DummyObjectChild, OtherBase):
+            e = 5
+
+        rpc_object = ExposedObject(MultipleChild(), members=("a", "d", "e"), exclude_inherited=True)
+
+        self.assertEqual(set(rpc_object), {":api", "e:get", "e:set"})
+
     def test_inherited_exposed(self):
         rpc_object = ExposedObject(DummyObjectChild(), members=("a", "c"))
 
@@ -161,6 +174,16 @@ class TestRPCObject(unittest.TestCase):
         self.assertTrue("methods" in api)
         self.assertEqual(set(api["methods"]), {":api", "a:set", "a:get"})
 
+    def test_get_api_reflects_added_and_removed_objects(self):
+        exposed_objects = ExposedObjectCollection({})
+        exposed_objects.get_api()
+
+        exposed_objects.add_object(DummyObject(), "testObject")
+        self.assertIn("testObject.a:get", exposed_objects.get_api()["methods"])
+
+        exposed_objects.remove_object("testObject")
+        self.assertNotIn("testObject.a:get", exposed_objects.get_api()["methods"])
+
     def test_lock_is_used_if_supplied(self):
         mock_lock = Mock()
         mock_lock.__enter__ = Mock()
@@ -250,6 +273,19 @@ class TestExposedObjectCollection(unittest.TestCase):
 
         self.assertRaises(RuntimeError, exposed_objects.remove_object, "does_not_exist")
 
+    def test_remove_object_leaves_objects_with_shared_prefix(self):
+        exposed_objects = ExposedObjectCollection({})
+        exposed_objects.add_object(DummyObject(), "a")
+        exposed_objects.add_object(DummyObject(), "a.b")
+
+        exposed_objects.remove_object("a")
+
+        self.assertListEqual(exposed_objects.get_objects(), ["a.b"])
+        self.assertIn("a.b:api", exposed_objects)
+        self.assertIn("a.b.a:get", exposed_objects)
+        self.assertNotIn("a:api", exposed_objects)
+        self.assertNotIn("a.a:get", exposed_objects)
+
 
 class TestControlServer(unittest.TestCase):
     @patch("zmq.Context")
@@ -292,10 +328,102 @@ class TestControlServer(unittest.TestCase):
 
         server = ControlServer(None, connection_string="127.0.0.1:10000")
         server._socket = mock_socket
+        server._poller = Mock()
         assertRaisesNothing(self, server.process)
 
+        server._poller.poll.assert_called_once_with(0)
         mock_socket.recv_unicode.assert_has_calls([call(flags=zmq.NOBLOCK)])
 
+    def test_process_does_not_receive_without_pending_request(self):
+        mock_socket = Mock()
+
+        server = ControlServer(None, connection_string="127.0.0.1:10000")
+        server._socket = mock_socket
+        server._poller = Mock()
+        server._poller.poll.return_value = []
+        server.process(blocking=True)
+
+        server._poller.poll.assert_called_once_with(100)
+        mock_socket.recv_unicode.assert_not_called()
+
+    @parameterized.expand(
+        [
+            ("single", '{"jsonrpc": "2.0", "id": "1", "method": "f", "params": []}', False),
+            ("batch", '[{"jsonrpc": "2.0", "id": "1", "method": "f", "params": []}]', True),
+        ]
+    )
+    def test_unserializable_result_returns_error(self, _, request, is_batch):
+        mock_socket = Mock()
+        mock_socket.recv_unicode.side_effect = [request, zmq.Again()]
+
+        obj = Mock()
+        obj.f.return_value = object()
+
+        server = ControlServer(ExposedObject(obj, ("f",)), connection_string="127.0.0.1:10000")
+        server._socket = mock_socket
+        server._poller = Mock()
+        server.process()
+
+        (response,), _ = mock_socket.send_unicode.call_args
+        response = json.loads(response)
+        response = response[0] if is_batch else response
+
+        self.assertEqual(response["id"], "1")
+        self.assertEqual(response["error"]["data"]["type"], "TypeError")
+
+    def test_unserializable_result_in_batch_only_replaces_its_response(self):
+        mock_socket = Mock()
+        mock_socket.recv_unicode.side_effect = [
+            '[{"jsonrpc": "2.0", "id": "1", "method": "g", "params": []},'
+            ' {"jsonrpc": "2.0", "id": "2", "method": "f", "params": []}]',
+            zmq.Again(),
+        ]
+
+        obj = Mock()
+        obj.g.return_value = 42
+        obj.f.return_value = object()
+
+        server = ControlServer(ExposedObject(obj, ("f", "g")), connection_string="127.0.0.1:10000")
+        server._socket = mock_socket
+        server._poller = Mock()
+        server.process()
+
+        (response,), _ = mock_socket.send_unicode.call_args
+        responses = {entry["id"]: entry for entry in json.loads(response)}
+
+        self.assertEqual(responses["1"]["result"], 42)
+        self.assertNotIn("error", responses["1"])
+        self.assertEqual(responses["2"]["error"]["data"]["type"], "TypeError")
+
+    def test_process_handles_all_pending_requests(self):
+        mock_socket = Mock()
+        mock_socket.recv_unicode.side_effect = [
+            '{"jsonrpc": "2.0", "id": "1", "method": ":api", "params": []}',
+            '{"jsonrpc": "2.0", "id": "2", "method": ":api", "params": []}',
+            zmq.Again(),
+        ]
+
+        server = ControlServer(ExposedObject(Mock(), ("a",)), connection_string="127.0.0.1:10000")
+        server._socket = mock_socket
+        server._poller = Mock()
+        server.process()
+
+        self.assertEqual(mock_socket.send_unicode.call_count, 2)
+
+    def test_process_handles_at_most_max_batch_size_requests(self):
+        mock_socket = Mock()
+        mock_socket.recv_unicode.return_value = (
+            '{"jsonrpc": "2.0", "id": "1", "method": ":api", "params": []}'
+        )
+
+        server = ControlServer(ExposedObject(Mock(), ("a",)), connection_string="127.0.0.1:10000")
+        server.max_batch_size = 3
+        server._socket = mock_socket
+        server._poller = Mock()
+        server.process()
+
+        self.assertEqual(mock_socket.send_unicode.call_count, 3)
+
     def test_exposed_object_is_exposed_directly(self):
         mock_collection = Mock(spec=ExposedObject)
 
@@ -310,6 +438,18 @@ class TestControlServer(unittest.TestCase):
 
         exposed_object_mock.assert_called_once_with("test")
 
+    @patch("zmq.Poller")
+    @patch("zmq.Context")
+    def test_poller_is_created_once(self, mock_context, mock_poller):
+        server = ControlServer(None, connection_string="127.0.0.1:10000")
+        server.start_server()
+        server.start_server()
+
+        mock_poller.assert_called_once_with()
+        mock_poller().register.assert_called_once_with(
+            mock_context().socket(), zmq.POLLIN
+        )
+
     @patch("zmq.Context")
     def test_is_running(self, mock_context):
         server = ControlServer(None, connection_string="127.0.0.1:10000")
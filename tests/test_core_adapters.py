@@ -1,7 +1,8 @@
 import inspect
+import time
 import unittest
 
-from mock import MagicMock, Mock
+from mock import MagicMock, Mock, patch
 
 from lewis.core.adapters import Adapter, AdapterCollection, NoLock
 from lewis.core.exceptions import LewisException
@@ -54,6 +55,29 @@ class TestAdapter(unittest.TestCase):
 
         self.assertEqual(inspect.cleandoc(adapter.__doc__), adapter.documentation)
 
+    def test_documentation_is_not_inherited_from_cache(self):
+        class UndocumentedAdapter(DummyAdapter):
+            pass
+
+        self.assertTrue(DummyAdapter("foo").documentation)
+        self.assertEqual(UndocumentedAdapter("bar").documentation, "")
+
+    def test_default_handle_waits_for_cycle_delay(self):
+        adapter = Adapter()
+
+        with patch.object(adapter._wakeup, "wait") as wait_mock:
+            adapter.handle(0.25)
+
+        wait_mock.assert_called_once_with(0.25)
+
+    def test_wake_ends_idle_handle(self):
+        adapter = Adapter()
+        adapter.wake()
+
+        start = time.monotonic()
+        adapter.handle(10.0)
+        self.assertLess(time.monotonic() - start, 5.0)
+
     def test_not_implemented_errors(self):
         adapter = Adapter()
 
@@ -84,6 +108,17 @@ class TestAdapter(unittest.TestCase):
 
         self.assertEqual(adapter.protocol, "foo")
 
+        adapter.interface = None
+        self.assertEqual(adapter.protocol, None)
+
+    def test_adapters_share_options_type(self):
+        first = DummyAdapter("foo", options={"bar": 2})
+        second = DummyAdapter("bar")
+
+        self.assertIs(type(first._options), type(second._options))
+        self.assertEqual(first._options, (True, 2))
+        self.assertEqual(second._options, (True, False))
+
     def test_options(self):
         assertRaisesNothing(
             self, DummyAdapter, "protocol", options={"bar": 2, "foo": 3}
@@ -92,6 +127,12 @@ class TestAdapter(unittest.TestCase):
             LewisException, DummyAdapter, "protocol", options={"invalid": False}
         )
 
+    def test_invalid_options_are_listed_in_order(self):
+        with self.assertRaises(LewisException) as context:
+            DummyAdapter("protocol", options={"foo": 1, "zed": 2, "abc": 3})
+
+        self.assertIn("Invalid options found: abc, zed.", str(context.exception))
+
 
 class TestAdapterCollection(unittest.TestCase):
     def test_add_adapter(self):
@@ -120,6 +161,28 @@ class TestAdapterCollection(unittest.TestCase):
 
         self.assertEqual(len(collection.protocols), 0)
 
+    def test_adapter_queries_reflect_added_and_removed_adapters(self):
+        collection = AdapterCollection(DummyAdapter("foo"))
+        self.assertEqual(collection.configuration(), {"foo": {"foo": True, "bar": False}})
+
+        collection.add_adapter(DummyAdapter("bar"))
+        self.assertEqual(set(collection.configuration()), {"foo", "bar"})
+
+        collection.remove_adapter("foo")
+        self.assertEqual(set(collection.configuration()), {"bar"})
+        self.assertRaises(RuntimeError, collection.configuration, "foo")
+
+    def test_adapter_lookup_cache_is_invalidated(self):
+        collection = AdapterCollection(DummyAdapter("foo"), DummyAdapter("bar"))
+        self.assertEqual(collection.configuration("bar"), {"bar": {"foo": True, "bar": False}})
+
+        collection.remove_adapter("bar")
+        self.assertRaises(RuntimeError, collection.configuration, "bar")
+
+        collection.add_adapter(DummyAdapter("bar", options={"foo": False}))
+        self.assertEqual(collection.configuration("bar"), {"bar": {"foo": False, "bar": False}})
+        self.assertEqual(set(collection.configuration("foo", "bar")), {"foo", "bar"})
+
     def test_connect_disconnect_connected(self):
         collection = AdapterCollection(
             DummyAdapter("foo", running=False), DummyAdapter("bar", running=False)
@@ -148,6 +211,22 @@ class TestAdapterCollection(unittest.TestCase):
 
         collection.disconnect()  # Clean up so that the test does not hang
 
+    def test_connect_starts_adapters_concurrently(self):
+        class SlowAdapter(DummyAdapter):
+            def start_server(self):
+                time.sleep(0.3)
+                super(SlowAdapter, self).start_server()
+
+        collection = AdapterCollection(SlowAdapter("foo"), SlowAdapter("bar"))
+
+        start = time.monotonic()
+        collection.connect()
+        self.assertLess(time.monotonic() - start, 0.55)
+        self.assertDictEqual(collection.is_connected(), {"bar": True, "foo": True})
+
+        collection.disconnect()
+        self.assertDictEqual(collection.is_connected(), {"bar": False, "foo": False})
+
     def test_configuration(self):
         collection = AdapterCollection(
             DummyAdapter("protocol_a", options={"bar": 2, "foo": 3}),
@@ -247,9 +247,10 @@ class TestDeviceRegistry(TestWithPackageStructure):
         registry = DeviceRegistry(self._tmp_package_name)
 
         devices = registry.devices
-        self.assertEqual(len(devices), 2)
+        self.assertEqual(len(devices), 3)
         self.assertIn("some_file", devices)
         self.assertIn("some_dir", devices)
+        self.assertIn("failing_module", devices)
 
     def test_device_builder(self):
         registry = DeviceRegistry(self._tmp_package_name)
@@ -258,6 +259,16 @@ class TestDeviceRegistry(TestWithPackageStructure):
         self.assertEqual(builder.name, "some_file")
         self.assertRaises(LewisException, registry.device_builder, "invalid_device")
 
+    def test_device_builder_is_created_once(self):
+        registry = DeviceRegistry(self._tmp_package_name)
+
+        self.assertIs(registry.device_builder("some_dir"), registry.device_builder("some_dir"))
+
+    def test_device_builder_for_failing_module_raises(self):
+        registry = DeviceRegistry(self._tmp_package_name)
+
+        self.assertRaises(LewisException, registry.device_builder, "failing_module")
+
 
 class TestIsInterface(unittest.TestCase):
     def test_not_a_type_returns_false(self):
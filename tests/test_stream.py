@@ -17,11 +17,23 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 # *********************************************************************
 
+import inspect
 import unittest
 
+from mock import patch
 from parameterized import parameterized
 
-from lewis.adapters.stream import Func
+from lewis.adapters.stream import (
+    Cmd,
+    CommandBase,
+    CommandDispatcher,
+    Func,
+    StreamAdapter,
+    StreamInterface,
+    Var,
+    regex,
+    scanf,
+)
 
 
 class TestFunc(unittest.TestCase):
@@ -122,3 +134,271 @@ class TestFunc(unittest.TestCase):
                 self.return_mapping,
             ).can_process(b"9")
         )
+
+
+class TestCommandDispatcher(unittest.TestCase):
+    """Unit tests for lewis.adapters.stream.CommandDispatcher"""
+
+    def setUp(self):
+        self.first = Func(lambda: 1, "A")
+        self.second = Func(lambda x: x, "A([0-9])")
+        self.dispatcher = CommandDispatcher([self.first, self.second])
+
+    def test_first_matching_command_is_returned(self):
+        self.assertEqual(self.dispatcher.match(b"A"), (self.first, "A", ()))
+
+    def test_later_command_is_returned_if_earlier_does_not_match(self):
+        dispatcher = CommandDispatcher([self.second, self.first])
+        self.assertEqual(dispatcher.match(b"A"), (self.first, "A", ()))
+
+    def test_no_match_returns_none(self):
+        self.assertEqual(self.dispatcher.match(b"B"), (None, None, None))
+
+    def test_patterns_are_combined(self):
+        self.assertTrue(self.dispatcher.is_combined)
+
+    @parameterized.expand(
+        [
+            ("backreference", r"(a)\1"),
+            ("named_backreference", r"(?P<x>a)(?P=x)"),
+            ("inline_flags", "(?i)a"),
+        ]
+    )
+    def test_patterns_with_group_references_or_flags_are_not_combined(self, _, pattern):
+        dispatcher = CommandDispatcher([self.first, Func(lambda *args: 0, pattern)])
+        self.assertFalse(dispatcher.is_combined)
+
+    def test_escaped_backslash_is_not_a_backreference(self):
+        dispatcher = CommandDispatcher([Func(lambda: 0, r"a\\1")])
+        self.assertTrue(dispatcher.is_combined)
+        self.assertEqual(dispatcher.match(b"a\\1")[2], ())
+
+    def test_combined_and_sequential_matching_agree(self):
+        commands = [
+            Func(lambda x: x, scanf("T=%d")),
+            Func(lambda x, y: x, r"T=(\d+)(\.\d+)?"),
+            Func(lambda: 0, "T"),
+            Func(lambda x: x, r"(?i:s)=([a-z]+)"),
+        ]
+        combined = CommandDispatcher(commands)
+        sequential = CommandDispatcher(commands + [Func(lambda x: x, r"(a)\1")])
+
+        self.assertTrue(combined.is_combined)
+        self.assertFalse(sequential.is_combined)
+
+        for request in [b"T=12", b"T=12.5", b"T", b"Tx", b"S=abc", b"s=", b"X"]:
+            self.assertEqual(combined.match(request), sequential.match(request), request)
+
+    def test_matched_arguments_can_be_processed(self):
+        dispatcher = CommandDispatcher([self.second, self.first])
+        cmd, _, arguments = dispatcher.match(b"A5")
+        self.assertEqual(cmd.process_match(arguments), b"5")
+
+
+class VarTarget:
+    def __init__(self):
+        self.foo = 1
+
+    @property
+    def bar(self):
+        """The bar."""
+        return self.foo + 1
+
+    @property
+    def baz(self):
+        return self.foo
+
+    @baz.setter
+    def baz(self, new_baz):
+        self.foo = new_baz
+
+
+class TrackingVarTarget(VarTarget):
+    def __setattr__(self, name, value):
+        super(TrackingVarTarget, self).__setattr__(name, value)
+        self.__dict__["last_set"] = name
+
+
+class TestVar(unittest.TestCase):
+    """Unit tests for lewis.adapters.stream.Var"""
+
+    def test_bind_reads_and_writes_target(self):
+        target = VarTarget()
+        getter, setter = Var(
+            "foo", read_pattern="F", write_pattern=r"F=(\d+)", argument_mappings=(int,)
+        ).bind(target)
+
+        setter.process_request(b"F=5")
+        self.assertEqual(target.foo, 5)
+        self.assertEqual(getter.process_request(b"F"), "5")
+
+    def test_bind_copies_property_doc(self):
+        (getter,) = Var("bar", read_pattern="B").bind(VarTarget())
+        self.assertEqual(inspect.getdoc(getter.func), "Getter: The bar.")
+
+    def test_rebind_reuses_matcher_and_uses_new_target(self):
+        var = Var("foo", read_pattern="F")
+        first_target, second_target = VarTarget(), VarTarget()
+        second_target.foo = 2
+
+        (first,) = var.bind(first_target)
+        (second,) = var.bind(second_target)
+
+        self.assertIs(first.matcher, second.matcher)
+        self.assertEqual(first.process_request(b"F"), "1")
+        self.assertEqual(second.process_request(b"F"), "2")
+
+    def test_bind_uses_property_setter(self):
+        target = VarTarget()
+        getter, setter = Var("baz", read_pattern="Z", write_pattern=r"Z=(\d+)").bind(target)
+
+        setter.process_request(b"Z=3")
+        self.assertEqual(target.foo, b"3")
+        self.assertEqual(getter.process_request(b"Z"), "b'3'")
+
+    def test_read_only_property_can_not_be_written(self):
+        (setter,) = Var("bar", write_pattern=r"B=(\d+)").bind(VarTarget())
+
+        with self.assertRaises(AttributeError):
+            setter.process_request(b"B=3")
+
+    def test_bind_respects_custom_setattr(self):
+        target = TrackingVarTarget()
+        (setter,) = Var("foo", write_pattern=r"F=(\d+)").bind(target)
+
+        setter.process_request(b"F=3")
+        self.assertEqual(target.last_set, "foo")
+
+    def test_bind_to_missing_member_returns_none(self):
+        self.assertIsNone(Var("qux", read_pattern="Q").bind(VarTarget()))
+
+
+class TestScanf(unittest.TestCase):
+    """Unit tests for lewis.adapters.stream.scanf"""
+
+    def test_exact_match_only_matches_entire_request(self):
+        matcher = scanf("T=%f")
+        self.assertEqual(matcher.match(b"T=4.0"), (b"4.0",))
+        self.assertIsNone(matcher.match(b"T=4.0garbage"))
+
+    def test_non_exact_match_matches_prefix(self):
+        matcher = scanf("T=%f", exact_match=False)
+        self.assertEqual(matcher.match(b"T=4.0garbage"), (b"4.0",))
+
+    def test_generated_pattern_has_no_anchors(self):
+        pattern = scanf("T=%f").compiled_pattern.pattern
+        self.assertFalse(pattern.startswith(b"^") or pattern.endswith(b"$"))
+
+
+class TestRegex(unittest.TestCase):
+    """Unit tests for lewis.adapters.stream.regex"""
+
+    def test_identical_patterns_share_compiled_expression(self):
+        self.assertIs(regex("A([0-9])").compiled_pattern, regex("A([0-9])").compiled_pattern)
+
+
+class CmdTarget:
+    def __init__(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+
+class TestCmd(unittest.TestCase):
+    """Unit tests for lewis.adapters.stream.Cmd"""
+
+    def test_rebind_reuses_matcher_and_uses_new_target(self):
+        cmd = Cmd("get", "G")
+        first_target, second_target = CmdTarget(1), CmdTarget(2)
+
+        (first,) = cmd.bind(first_target)
+        (second,) = cmd.bind(second_target)
+
+        self.assertIs(first.matcher, second.matcher)
+        self.assertEqual(first.process_request(b"G"), "1")
+        self.assertEqual(second.process_request(b"G"), "2")
+
+
+class TestStreamInterface(unittest.TestCase):
+    """Unit tests for lewis.adapters.stream.StreamInterface"""
+
+    def test_bind_device_keeps_command_order(self):
+        class Interface(StreamInterface):
+            commands = [Cmd(lambda: 1, "B"), Cmd(lambda: 2, "A")]
+
+        interface = Interface()
+        interface.device = object()
+
+        self.assertEqual([cmd.matcher.pattern for cmd in interface.bound_commands], ["B", "A"])
+
+    def test_rebind_prefers_previous_target(self):
+        class Interface(StreamInterface):
+            commands = [Cmd("get", "G")]
+
+        cmd = Interface.commands[0]
+        interface = Interface()
+
+        with patch.object(cmd, "bind", wraps=cmd.bind) as bind_mock:
+            interface.device = CmdTarget(1)
+            self.assertEqual(bind_mock.call_count, 2)
+
+            interface.device = CmdTarget(2)
+            self.assertEqual(bind_mock.call_count, 3)
+
+        self.assertEqual(interface.dispatch(b"G")[0].process_request(b"G"), "2")
+
+    def test_command_without_base_init_can_be_bound(self):
+        class CustomCommand(CommandBase):
+            def __init__(self, func, pattern):
+                self.func = func
+                self.pattern = pattern
+
+            def bind(self, target):
+                method = getattr(target, self.func, None)
+                return None if method is None else [Func(method, self.pattern)]
+
+        class Interface(StreamInterface):
+            commands = [CustomCommand("get", "G")]
+
+        interface = Interface()
+        interface.device = CmdTarget(1)
+        interface.device = CmdTarget(2)
+
+        self.assertEqual(interface.dispatch(b"G")[0].process_request(b"G"), 2)
+
+    def test_missing_member_raises(self):
+        class Interface(StreamInterface):
+            commands = [Cmd("get", "G")]
+
+        with self.assertRaises(RuntimeError):
+            Interface().device = object()
+
+    def test_duplicate_patterns_raise(self):
+        class Interface(StreamInterface):
+            commands = [Cmd(lambda: 1, "A"), Cmd(lambda: 2, "A")]
+
+        with self.assertRaises(RuntimeError):
+            Interface().device = object()
+
+
+class TestStreamAdapter(unittest.TestCase):
+    """Unit tests for lewis.adapters.stream.StreamAdapter"""
+
+    def test_documentation_follows_rebinding(self):
+        class Interface(StreamInterface):
+            commands = [Cmd("get", "G", doc="Gets the value.")]
+
+        adapter = StreamAdapter()
+        adapter.interface = Interface()
+        adapter.interface.device = CmdTarget(1)
+
+        documentation = adapter.documentation
+        self.assertIn("G:\n    Gets the value.", documentation)
+        self.assertEqual(adapter.documentation, documentation)
+
+        Interface.commands = [Cmd("get", "V", doc="Gets the value.")]
+        adapter.interface.device = CmdTarget(2)
+
+        self.assertIn("V:\n    Gets the value.", adapter.documentation)
+        self.assertNotIn("G:\n", adapter.documentation)
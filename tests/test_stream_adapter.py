@@ -1,9 +1,29 @@
+import asyncore
+import socket
+import threading
+import time
 import unittest
 
 from mock import MagicMock, patch
 from parameterized import parameterized
 
-from lewis.adapters.stream import StreamHandler
+from lewis.adapters.stream import (
+    Cmd,
+    CommandDispatcher,
+    Func,
+    PatternMatcher,
+    StreamHandler,
+    StreamInterface,
+    StreamServer,
+)
+
+
+class RaisingMatcher(PatternMatcher):
+    arg_count = 0
+    argument_mappings = None
+
+    def match(self, request):
+        raise ValueError("Matcher failed.")
 
 
 @patch("asynchat.async_chat")
@@ -11,6 +31,7 @@ class TestStreamHandler(unittest.TestCase):
     def setUp(self):
         """Create a mock for the async_chat class"""
         self.target = MagicMock()
+        self.target.max_batch_size = 10
         self.stream_server = MagicMock()
         self.socket = MagicMock()
         self.handler = StreamHandler(self.socket, self.target, self.stream_server)
@@ -28,6 +49,141 @@ class TestStreamHandler(unittest.TestCase):
         self, terminator, message, expected, async_push, _
     ):
         self.target.out_terminator = terminator
+        self.handler.connected = True
         self.handler.unsolicited_reply(message)
+        self.handler.flush_unsolicited()
 
         self.assertEqual(expected, async_push.call_args[0][0])
+
+    @patch("asynchat.async_chat.push")
+    def test_unsolicited_replies_are_sent_in_one_push(self, async_push, _):
+        self.target.out_terminator = b"\n"
+        self.handler.connected = True
+        self.handler.unsolicited_reply("a")
+        self.handler.unsolicited_reply(b"b")
+
+        async_push.assert_not_called()
+        self.stream_server.schedule_flush.assert_called_with(self.handler)
+
+        self.handler.flush_unsolicited()
+        async_push.assert_called_once_with(b"a\nb\n")
+
+    @patch("asynchat.async_chat.push")
+    def test_unsolicited_replies_are_sent_when_batch_is_full(self, async_push, _):
+        self.target.out_terminator = b"\n"
+        self.handler.connected = True
+        self.handler._max_batch_size = 2
+        self.handler.unsolicited_reply("a")
+        self.handler.unsolicited_reply("b")
+
+        async_push.assert_called_once_with(b"a\nb\n")
+
+    def test_incoming_data_schedules_readtimeout(self, _):
+        self.handler._readtimeout = 100
+        self.handler.collect_incoming_data(b"abc")
+
+        self.stream_server.schedule_readtimeout.assert_called_once_with(self.handler, 1)
+
+    def test_incoming_data_does_not_schedule_disabled_readtimeout(self, _):
+        self.handler._readtimeout = 0
+        self.handler.collect_incoming_data(b"abc")
+
+        self.stream_server.schedule_readtimeout.assert_not_called()
+
+    @patch("asynchat.async_chat.push")
+    def test_stale_readtimeout_is_ignored(self, async_push, _):
+        self.handler.connected = True
+        self.handler.collect_incoming_data(b"ab")
+        self.handler.collect_incoming_data(b"c")
+
+        self.handler.handle_readtimeout(1)
+        self.target.handle_error.assert_not_called()
+
+        self.handler.handle_readtimeout(2)
+        self.target.handle_error.assert_called_once()
+
+    @patch("asynchat.async_chat.push")
+    def test_large_unsolicited_replies_are_pushed_without_copy(self, async_push, _):
+        self.target.out_terminator = b"\n"
+        self.handler.connected = True
+        self.handler.ac_out_buffer_size = 4
+        self.handler.unsolicited_reply(b"abcdefgh")
+        self.handler.flush_unsolicited()
+
+        pushed = async_push.call_args[0][0]
+        self.assertIsInstance(pushed, memoryview)
+        self.assertEqual(pushed.tobytes(), b"abcdefgh\n")
+
+    @patch("asynchat.async_chat.push")
+    def test_matcher_errors_are_handled_by_interface(self, async_push, _):
+        self.target.out_terminator = b"\r\n"
+        self.target.handle_error.return_value = "ERR"
+        self.target.dispatch = CommandDispatcher(
+            [Func(lambda: "OK", RaisingMatcher("A"))]
+        ).match
+        self.handler.connected = True
+
+        self.handler.collect_incoming_data(b"A")
+        self.handler.found_terminator()
+
+        request, error = self.target.handle_error.call_args[0]
+        self.assertEqual(request, b"A")
+        self.assertIsInstance(error, ValueError)
+        async_push.assert_called_once_with(b"ERR\r\n")
+
+
+class UnsolicitedReplyInterface(StreamInterface):
+    commands = {Cmd("get", "^G$")}
+
+    in_terminator = "\r\n"
+    out_terminator = "\r\n"
+
+    def get(self):
+        self.handler.unsolicited_reply("UNSOLICITED")
+        return "REPLY"
+
+
+class TestStreamServer(unittest.TestCase):
+    def setUp(self):
+        # Other tests can leave mocked dispatchers behind in asyncore's global socket map
+        socket_map_patch = patch.dict(asyncore.socket_map, clear=True)
+        socket_map_patch.start()
+        self.addCleanup(socket_map_patch.stop)
+
+        interface = UnsolicitedReplyInterface()
+        interface.device = None
+
+        self.server = StreamServer("127.0.0.1", 0, interface, threading.Lock())
+        self.client = socket.create_connection(self.server.socket.getsockname())
+        self.client.settimeout(0.01)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.close()
+
+    def _receive_lines(self, count):
+        data = b""
+        deadline = time.monotonic() + 2.0
+
+        while data.count(b"\r\n") < count and time.monotonic() < deadline:
+            asyncore.loop(0.01, count=1)
+            self.server.process()
+
+            try:
+                data += self.client.recv(1024)
+            except socket.timeout:
+                pass
+
+        return data
+
+    def test_unsolicited_reply_is_sent_before_reply(self):
+        self.client.sendall(b"G\r\n")
+
+        self.assertEqual(self._receive_lines(2), b"UNSOLICITED\r\nREPLY\r\n")
+
+    def test_process_accepts_legacy_msec_argument(self):
+        self.client.sendall(b"G\r\n")
+        asyncore.loop(0.01, count=1)
+
+        self.server.process(10)
+        self.assertEqual(self._receive_lines(2), b"UNSOLICITED\r\nREPLY\r\n")